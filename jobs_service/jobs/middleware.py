@@ -2,10 +2,19 @@ import logging
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from .services import UserService
+from .tasks import enqueue, record_job_view
 
 logger = logging.getLogger(__name__)
 
 
+def get_client_ip(request):
+    """Get client IP address, preferring the first X-Forwarded-For hop"""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        return x_forwarded_for.split(',')[0]
+    return request.META.get('REMOTE_ADDR')
+
+
 class AuthenticationMiddleware(MiddlewareMixin):
     """
     Middleware to handle authentication with Users service
@@ -289,12 +298,39 @@ class RateLimitMiddleware(MiddlewareMixin):
 
     def _get_client_ip(self, request):
         """Get client IP address"""
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
+
+
+class JobViewTrackingMiddleware(MiddlewareMixin):
+    """
+    Records successful public job detail views after the response is built,
+    handing the write to the record_job_view Celery task when a worker is configured
+    """
+
+    def process_response(self, request, response):
+        match = request.resolver_match
+        if (
+            response.status_code != 200
+            or request.method != 'GET'
+            or match is None
+            or match.view_name != 'jobs:job-detail'
+        ):
+            return response
+
+        try:
+            enqueue(
+                record_job_view,
+                str(match.kwargs['id']),
+                # DRF stores the authenticated user on the underlying request
+                viewer_id=getattr(getattr(request, 'user', None), 'user_id', None),
+                ip_address=get_client_ip(request),
+                user_agent=request.META.get('HTTP_USER_AGENT', ''),
+                referrer=request.META.get('HTTP_REFERER', ''),
+            )
+        except Exception as e:
+            logger.error(f"Error tracking job view: {e}")
+
+        return response
 
 
 class DockerHostnameMiddleware:
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-16 16:59
+
+from django.db import migrations, models
+
+
+# Frozen copy of jobs.models.format_budget_display as of this migration
+def format_budget_display(job_type, budget_min, budget_max, hourly_rate_min, hourly_rate_max):
+    if job_type == 'hourly':
+        if hourly_rate_min and hourly_rate_max:
+            return '${}-${}/hr'.format(hourly_rate_min, hourly_rate_max)
+        return 'Hourly rate not specified'
+    if budget_min and budget_max:
+        return '${:,.0f}-${:,.0f}'.format(budget_min, budget_max)
+    return 'Budget not specified'
+
+
+def populate_budget_display(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    jobs = list(Job.objects.only(
+        'id', 'job_type', 'budget_min', 'budget_max', 'hourly_rate_min', 'hourly_rate_max'
+    ))
+    for job in jobs:
+        job.budget_display = format_budget_display(
+            job.job_type, job.budget_min, job.budget_max,
+            job.hourly_rate_min, job.hourly_rate_max
+        )
+    Job.objects.bulk_update(jobs, ['budget_display'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_alter_jobattachment_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='budget_display',
+            field=models.CharField(blank=True, editable=False, help_text='Precomputed on save for serialization', max_length=100),
+        ),
+        migrations.RunPython(populate_budget_display, migrations.RunPython.noop),
+    ]
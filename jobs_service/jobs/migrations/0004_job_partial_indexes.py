@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_job_budget_display'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='jobs_job_client__3a6f6e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['client_id', 'status', '-created_at'], name='job_client_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-created_at'], name='job_published_recent_idx'),
+        ),
+    ]
@@ -1,10 +1,66 @@
 # jobs/models.py
 from django.db import models
+from django.core.cache import cache
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 import uuid
 
 
+# Budget display formats keyed by job type; milestone jobs share the fixed-price range format.
+BUDGET_FMT = {
+    'hourly': '${}-${}/hr',
+    'fixed': '${:,.0f}-${:,.0f}',
+    'milestone': '${:,.0f}-${:,.0f}',
+}
+BUDGET_FALLBACK = {
+    'hourly': 'Hourly rate not specified',
+}
+DEFAULT_BUDGET_FALLBACK = 'Budget not specified'
+
+BUDGET_FIELDS = ('job_type', 'budget_min', 'budget_max', 'hourly_rate_min', 'hourly_rate_max')
+
+
+def validate_budget(job_type, budget_min, budget_max, hourly_rate_min, hourly_rate_max):
+    """Return the budget error message for a job, or None when the budget is valid"""
+    if job_type == 'hourly':
+        if not hourly_rate_min or not hourly_rate_max:
+            return "Hourly rate range is required for hourly jobs"
+        if hourly_rate_max < hourly_rate_min:
+            return "Maximum hourly rate must be greater than minimum"
+    elif job_type in ('fixed', 'milestone'):
+        if not budget_min or not budget_max:
+            return "Budget range is required for fixed price and milestone jobs"
+        if budget_max < budget_min:
+            return "Maximum budget must be greater than minimum budget"
+    return None
+
+
+# Published-jobs-per-category count used by JobDetailSerializer.similar_jobs_count
+SIMILAR_JOBS_COUNT_KEY = 'similar_count:{}'
+SIMILAR_JOBS_COUNT_TIMEOUT = 120
+
+# Serialized category/skill catalogs; cleared by jobs.signals and on job status/category changes
+JOB_CATEGORIES_CACHE_KEY = 'job_categories_v1'
+SKILLS_CACHE_KEY = 'skills_v1'
+CATALOG_CACHE_TIMEOUT = 600
+
+# First-page JobListView responses; every Job save/delete bumps the version so stale pages are never read
+JOB_LIST_CACHE_KEY = 'joblist:{}:{}'
+JOB_LIST_VERSION_KEY = 'joblist:ver'
+JOB_LIST_CACHE_TIMEOUT = 30
+
+
+def format_budget_display(job_type, budget_min, budget_max, hourly_rate_min, hourly_rate_max):
+    """Render the human readable budget range for a job"""
+    if job_type == 'hourly':
+        low, high = hourly_rate_min, hourly_rate_max
+    else:
+        low, high = budget_min, budget_max
+    if low and high:
+        return BUDGET_FMT.get(job_type, BUDGET_FMT['fixed']).format(low, high)
+    return BUDGET_FALLBACK.get(job_type, DEFAULT_BUDGET_FALLBACK)
+
+
 class JobCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
@@ -89,6 +145,8 @@ class Job(models.Model):
     hourly_rate_max = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)], null=True,
                                           blank=True)
     currency = models.CharField(max_length=3, default='USD')
+    budget_display = models.CharField(max_length=100, blank=True, editable=False,
+                                      help_text="Precomputed on save for serialization")
 
     # Project Details
     remote_allowed = models.BooleanField(default=True)
@@ -123,7 +181,12 @@ class Job(models.Model):
         indexes = [
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['category', 'status']),
-            models.Index(fields=['client_id', 'status']),
+            models.Index(fields=['client_id', 'status', '-created_at'], name='job_client_status_idx'),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status='published'),
+                name='job_published_recent_idx',
+            ),
             models.Index(fields=['job_type', 'status']),
             models.Index(fields=['published_at']),
             models.Index(fields=['is_featured', 'is_urgent']),
@@ -132,19 +195,21 @@ class Job(models.Model):
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember persisted values so save() only invalidates counts when they change
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def clean(self):
-        # Budget validation
-        if self.job_type == 'fixed' or self.job_type == 'milestone':
-            if not self.budget_min or not self.budget_max:
-                raise ValidationError("Budget range is required for fixed/milestone jobs")
-            if self.budget_max < self.budget_min:
-                raise ValidationError("Maximum budget must be greater than minimum budget")
-
-        elif self.job_type == 'hourly':
-            if not self.hourly_rate_min or not self.hourly_rate_max:
-                raise ValidationError("Hourly rate range is required for hourly jobs")
-            if self.hourly_rate_max < self.hourly_rate_min:
-                raise ValidationError("Maximum hourly rate must be greater than minimum")
+        error = validate_budget(
+            self.job_type, self.budget_min, self.budget_max,
+            self.hourly_rate_min, self.hourly_rate_max
+        )
+        if error:
+            raise ValidationError(error)
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -154,7 +219,30 @@ class Job(models.Model):
         # Generate search keywords
         self.search_keywords = f"{self.title} {self.description}".lower()
 
+        self.budget_display = format_budget_display(
+            self.job_type, self.budget_min, self.budget_max,
+            self.hourly_rate_min, self.hourly_rate_max
+        )
+
         super().save(*args, **kwargs)
+        self._invalidate_category_counts()
+
+    def _invalidate_category_counts(self):
+        loaded_category_id = getattr(self, '_loaded_category_id', None)
+        loaded_status = getattr(self, '_loaded_status', None)
+        if loaded_category_id == self.category_id and loaded_status == self.status:
+            return
+
+        cache.delete_many([
+            JOB_CATEGORIES_CACHE_KEY,
+            *(
+                SIMILAR_JOBS_COUNT_KEY.format(category_id)
+                for category_id in {loaded_category_id, self.category_id}
+                if category_id
+            ),
+        ])
+        self._loaded_category_id = self.category_id
+        self._loaded_status = self.status
 
 
 class JobAttachment(models.Model):
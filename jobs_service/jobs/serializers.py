@@ -1,10 +1,41 @@
 # jobs/serializers.py
+import functools
+
 from rest_framework import serializers
+from django.core.cache import cache
 from django.utils import timezone
-from .models import Job, JobCategory, Skill, JobAttachment, JobMilestone, JobSave
+from .models import (
+    BUDGET_FIELDS, SIMILAR_JOBS_COUNT_KEY, SIMILAR_JOBS_COUNT_TIMEOUT, validate_budget,
+    Job, JobCategory, Skill, JobAttachment, JobMilestone, JobSave
+)
+
+
+
+MINUTES_PER_DAY = 24 * 60
+
 
+@functools.lru_cache(maxsize=4096)
+def _time_posted_str(minutes):
+    """Relative label for an age in whole minutes; ages past a day are bucketed by day"""
+    if minutes >= MINUTES_PER_DAY:
+        days = minutes // MINUTES_PER_DAY
+        return f"{days} day{'s' if days > 1 else ''} ago"
+    if minutes >= 60:
+        hours = minutes // 60
+        return f"{hours} hour{'s' if hours > 1 else ''} ago"
+    return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
 
 
+def time_posted(created_at, date_after_days=None):
+    """Human readable age of a job, optionally switching to a date for older posts"""
+    total_seconds = max(int((timezone.now() - created_at).total_seconds()), 0)
+    minutes = total_seconds // 60
+    if date_after_days is not None and minutes >= (date_after_days + 1) * MINUTES_PER_DAY:
+        return created_at.strftime("%B %d, %Y")
+    if minutes >= MINUTES_PER_DAY:
+        minutes -= minutes % MINUTES_PER_DAY
+    return _time_posted_str(minutes)
+
 
 class SkillSerializer(serializers.ModelSerializer):
     class Meta:
@@ -33,10 +64,14 @@ class JobAttachmentSerializer(serializers.ModelSerializer):
 
     def get_file_url(self, obj):
         if obj.file:
+            url = obj.file.url
+            base_url = self.context.get('base_url')
+            if base_url and url.startswith('/'):
+                return f"{base_url}{url}"
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.file.url)
-            return obj.file.url
+                return request.build_absolute_uri(url)
+            return url
         return None
 
 
@@ -66,7 +101,7 @@ class JobListSerializer(serializers.ModelSerializer):
     category = JobCategorySerializer(read_only=True)
     skills = SkillSerializer(many=True, read_only=True)
     client_info = ClientInfoSerializer(read_only=True)
-    budget_display = serializers.SerializerMethodField()
+    budget_display = serializers.CharField(read_only=True)
     time_posted = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
 
@@ -80,28 +115,8 @@ class JobListSerializer(serializers.ModelSerializer):
             'deadline', 'is_saved','status',
         ]
 
-    def get_budget_display(self, obj):
-        if obj.job_type == 'hourly':
-            if obj.hourly_rate_min and obj.hourly_rate_max:
-                return f"${obj.hourly_rate_min}-${obj.hourly_rate_max}/hr"
-            return "Hourly rate not specified"
-        else:
-            if obj.budget_min and obj.budget_max:
-                return f"${obj.budget_min:,.0f}-${obj.budget_max:,.0f}"
-            return "Budget not specified"
-
     def get_time_posted(self, obj):
-        now = timezone.now()
-        diff = now - obj.created_at
-
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        else:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+        return time_posted(obj.created_at)
 
     def get_is_saved(self, obj):
         request = self.context.get('request')
@@ -117,7 +132,7 @@ class JobDetailSerializer(serializers.ModelSerializer):
     attachments = JobAttachmentSerializer(many=True, read_only=True)
     milestones = JobMilestoneSerializer(many=True, read_only=True)
     client_info = ClientInfoSerializer(read_only=True)
-    budget_display = serializers.SerializerMethodField()
+    budget_display = serializers.CharField(read_only=True)
     time_posted = serializers.SerializerMethodField()
     is_saved = serializers.SerializerMethodField()
     similar_jobs_count = serializers.SerializerMethodField()
@@ -134,29 +149,8 @@ class JobDetailSerializer(serializers.ModelSerializer):
             'attachments', 'milestones', 'is_saved', 'similar_jobs_count', 'tags'
         ]
 
-    def get_budget_display(self, obj):
-        if obj.job_type == 'hourly':
-            if obj.hourly_rate_min and obj.hourly_rate_max:
-                return f"${obj.hourly_rate_min}-${obj.hourly_rate_max}/hr"
-        else:
-            if obj.budget_min and obj.budget_max:
-                return f"${obj.budget_min:,.0f}-${obj.budget_max:,.0f}"
-        return "Budget not specified"
-
     def get_time_posted(self, obj):
-        now = timezone.now()
-        diff = now - obj.created_at
-
-        if diff.days > 7:
-            return obj.created_at.strftime("%B %d, %Y")
-        elif diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        else:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+        return time_posted(obj.created_at, date_after_days=7)
 
     def get_is_saved(self, obj):
         request = self.context.get('request')
@@ -165,12 +159,18 @@ class JobDetailSerializer(serializers.ModelSerializer):
         return False
 
     def get_similar_jobs_count(self, obj):
-        if obj.category:
-            return Job.objects.filter(
-                category=obj.category,
-                status='published'
-            ).exclude(id=obj.id).count()
-        return 0
+        if not obj.category_id:
+            return 0
+
+        count = cache.get_or_set(
+            SIMILAR_JOBS_COUNT_KEY.format(obj.category_id),
+            lambda: Job.objects.filter(category_id=obj.category_id, status='published').count(),
+            SIMILAR_JOBS_COUNT_TIMEOUT
+        )
+        # The cached count includes this job when it is itself published
+        if obj.status == 'published':
+            count -= 1
+        return max(count, 0)
 
 
 class JobCreateUpdateSerializer(serializers.ModelSerializer):
@@ -195,25 +195,13 @@ class JobCreateUpdateSerializer(serializers.ModelSerializer):
     def validate(self, data):
         job_type = data.get('job_type')
 
-        # Budget validation based on job type
-        if job_type == 'hourly':
-            if not data.get('hourly_rate_min') or not data.get('hourly_rate_max'):
-                raise serializers.ValidationError(
-                    "Hourly rate range is required for hourly jobs"
-                )
-            if data.get('hourly_rate_max', 0) < data.get('hourly_rate_min', 0):
-                raise serializers.ValidationError(
-                    "Maximum hourly rate must be greater than minimum"
-                )
-        else:
-            if not data.get('budget_min') or not data.get('budget_max'):
-                raise serializers.ValidationError(
-                    "Budget range is required for fixed price and milestone jobs"
-                )
-            if data.get('budget_max', 0) < data.get('budget_min', 0):
-                raise serializers.ValidationError(
-                    "Maximum budget must be greater than minimum budget"
-                )
+        # Budget validation based on job type; partial updates that leave the
+        # budget untouched keep the already validated values
+        if not self.partial or any(field in data for field in BUDGET_FIELDS):
+            budget = {field: data.get(field, getattr(self.instance, field, None)) for field in BUDGET_FIELDS}
+            error = validate_budget(**budget)
+            if error:
+                raise serializers.ValidationError(error)
 
         # Milestone validation
         if job_type == 'milestone':
@@ -1,11 +1,33 @@
 
 import logging
+import orjson
 import requests
 from django.conf import settings
 from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
+# (output key, users-service key, default) used to project user payloads
+_FIELD_SPECS = (
+    ('id', 'id', None),
+    ('username', 'username', None),
+    ('first_name', 'first_name', None),
+    ('last_name', 'last_name', None),
+    ('profile_picture', 'profile_picture', None),
+    ('rating', 'rating', 0.0),
+    ('total_spent', 'total_spent', 0.0),
+    ('jobs_posted', 'jobs_posted', 0),
+    ('member_since', 'date_joined', None),
+    ('location', 'location', ''),
+    ('is_verified', 'is_verified', False),
+)
+
+
+def _project(user_data, specs=_FIELD_SPECS):
+    """Project a users-service payload onto the client_info shape in one pass"""
+    get = user_data.get
+    return {key: get(source, default) for key, source, default in specs}
+
 
 class UserService:
     """Client for communicating with Users Service"""
@@ -44,7 +66,7 @@ class UserService:
             )
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 transformed_data = self._transform_user_data(data)
 
                 if use_cache:
@@ -69,12 +91,15 @@ class UserService:
             return {}
 
         users_data = {}
-        uncached_ids = []
+        # A page usually repeats the same client, only look each one up once
+        user_ids = list(dict.fromkeys(user_ids))
 
         if use_cache:
+            # Single MGET for the whole page instead of one GET per user
+            cached = cache.get_many([f'user_profile_{user_id}' for user_id in user_ids])
+            uncached_ids = []
             for user_id in user_ids:
-                cache_key = f'user_profile_{user_id}'
-                cached_data = cache.get(cache_key)
+                cached_data = cached.get(f'user_profile_{user_id}')
                 if cached_data:
                     users_data[str(user_id)] = cached_data
                 else:
@@ -95,15 +120,16 @@ class UserService:
                 )
 
                 if response.status_code == 200:
-                    fetched_users = response.json().get('users', [])
+                    fetched_users = orjson.loads(response.content).get('users', [])
+                    to_cache = {}
                     for user in fetched_users:
                         user_id = user['id']
                         transformed_data = self._transform_user_data(user)
                         users_data[str(user_id)] = transformed_data
+                        to_cache[f'user_profile_{user_id}'] = transformed_data
 
-                        if use_cache:
-                            cache_key = f'user_profile_{user_id}'
-                            cache.set(cache_key, transformed_data, self.cache_timeout)
+                    if use_cache and to_cache:
+                        cache.set_many(to_cache, self.cache_timeout)
 
                     # Add fallback for missing users
                     for user_id in uncached_ids:
@@ -123,19 +149,7 @@ class UserService:
 
     def _transform_user_data(self, user_data):
         """Transform user data to expected format"""
-        return {
-            'id': user_data.get('id'),
-            'username': user_data.get('username'),
-            'first_name': user_data.get('first_name'),
-            'last_name': user_data.get('last_name'),
-            'profile_picture': user_data.get('profile_picture'),
-            'rating': user_data.get('rating', 0.0),
-            'total_spent': user_data.get('total_spent', 0.0),
-            'jobs_posted': user_data.get('jobs_posted', 0),
-            'member_since': user_data.get('date_joined'),
-            'location': user_data.get('location', ''),
-            'is_verified': user_data.get('is_verified', False),
-        }
+        return _project(user_data)
 
     def _get_fallback_user(self, user_id):
         """Return fallback user data"""
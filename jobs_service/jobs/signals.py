@@ -0,0 +1,27 @@
+# jobs/signals.py
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    JOB_CATEGORIES_CACHE_KEY, JOB_LIST_VERSION_KEY, SKILLS_CACHE_KEY,
+    Job, JobCategory, Skill
+)
+
+
+@receiver([post_save, post_delete], sender=JobCategory)
+def invalidate_job_categories(sender, **kwargs):
+    cache.delete(JOB_CATEGORIES_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_skills(sender, **kwargs):
+    cache.delete(SKILLS_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_job_list(sender, **kwargs):
+    try:
+        cache.incr(JOB_LIST_VERSION_KEY)
+    except ValueError:
+        cache.set(JOB_LIST_VERSION_KEY, 1, None)
@@ -0,0 +1,44 @@
+# jobs/storage.py
+import functools
+import os
+import uuid
+
+from django.conf import settings
+
+# Upper bound for job attachments, enforced by Django for direct uploads and by the S3 POST policy
+MAX_ATTACHMENT_SIZE = 10 * 1024 * 1024
+PRESIGN_EXPIRES_IN = 300
+
+
+@functools.lru_cache(maxsize=None)
+def get_s3_client():
+    import boto3
+
+    return boto3.client(
+        's3',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None,
+    )
+
+
+def attachment_key_prefix(job_id):
+    return f"job_attachments/{job_id}/"
+
+
+def presign_attachment_upload(job_id, filename, content_type):
+    """Presigned S3 POST the client uses to upload an attachment without going through Django"""
+    # Keep keys within FileField's 100 characters; the original name is stored on JobAttachment.filename
+    extension = os.path.splitext(filename)[1][:10]
+    key = f"{attachment_key_prefix(job_id)}{uuid.uuid4().hex}{extension}"
+    presigned = get_s3_client().generate_presigned_post(
+        Bucket=settings.AWS_S3_ATTACHMENTS_BUCKET,
+        Key=key,
+        Fields={'Content-Type': content_type},
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, MAX_ATTACHMENT_SIZE],
+        ],
+        ExpiresIn=PRESIGN_EXPIRES_IN,
+    )
+    return {'url': presigned['url'], 'fields': presigned['fields'], 'key': key}
@@ -0,0 +1,34 @@
+# jobs/tasks.py
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.db.models import F
+
+from .models import Job, JobView
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, *args, **kwargs):
+    """Queue a task when a broker is configured; otherwise, or if queuing fails, run it here"""
+    if settings.CELERY_BROKER_URL:
+        try:
+            task.delay(*args, **kwargs)
+            return
+        except Exception as e:
+            logger.error(f"Could not queue {task.name}, running inline: {e}")
+    task(*args, **kwargs)
+
+
+@shared_task(ignore_result=True, acks_late=False)
+def record_job_view(job_id, viewer_id=None, ip_address=None, user_agent="", referrer=""):
+    """Persist a JobView row and bump the job's view counter off the request thread"""
+    JobView.objects.create(
+        job_id=job_id,
+        viewer_id=viewer_id,
+        ip_address=ip_address,
+        user_agent=user_agent,
+        referrer=referrer,
+    )
+    Job.objects.filter(id=job_id).update(views_count=F("views_count") + 1)
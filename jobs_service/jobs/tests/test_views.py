@@ -1,10 +1,14 @@
-# jobs/tests/test.py
+# jobs/tests/test_views.py
+# Run with: python manage.py test jobs.tests --keepdb
+# (--keepdb reuses the test database between runs instead of recreating and migrating it)
+import jwt
+from django.conf import settings
 from django.urls import reverse
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch
-from ..models import Job
+from ..models import Job, JobView
 
 # Mock user class
 class MockUser:
@@ -14,26 +18,26 @@ class MockUser:
     is_authenticated = True
 
 class JobViewsTestCase(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.user = MockUser()
-        self.client.force_authenticate(user=self.user)
-
-        # Create a sample job
-        self.job = Job.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a sample job once for the class; each test rolls back to this state
+        cls.job = Job.objects.create(
             title="Test Job",
             description="Test Description",
-            client_id=self.user.id,
+            client_id=MockUser.id,
             status="published"
         )
 
-    @patch("jobs.views.get_client_info")
-    def test_job_list(self, mock_client_info):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = MockUser()
+        self.client.force_authenticate(user=self.user)
+        self.client_info = {"id": self.user.id, "username": "testuser"}
+
+    @patch("jobs.views.user_service.get_users_batch")
+    def test_job_list(self, mock_users_batch):
         """Test GET /api/jobs/ returns list of jobs"""
-        mock_client_info.return_value = {
-            "id": self.user.id,
-            "username": "testuser"
-        }
+        mock_users_batch.return_value = {str(self.user.id): self.client_info}
 
         url = reverse("jobs:job-list")
         response = self.client.get(url)
@@ -42,13 +46,10 @@ class JobViewsTestCase(TestCase):
         self.assertEqual(response.data["results"][0]["title"], "Test Job")
         self.assertEqual(response.data["results"][0]["client_info"]["username"], "testuser")
 
-    @patch("jobs.views.get_client_info")
-    def test_job_detail(self, mock_client_info):
+    @patch("jobs.views.user_service.get_user_profile")
+    def test_job_detail(self, mock_user_profile):
         """Test GET /api/jobs/<id>/"""
-        mock_client_info.return_value = {
-            "id": self.user.id,
-            "username": "testuser"
-        }
+        mock_user_profile.return_value = self.client_info
 
         url = reverse("jobs:job-detail", kwargs={"id": self.job.id})
         response = self.client.get(url)
@@ -56,18 +57,32 @@ class JobViewsTestCase(TestCase):
         self.assertEqual(response.data["title"], "Test Job")
         self.assertEqual(response.data["client_info"]["username"], "testuser")
 
-    @patch("jobs.views.get_client_info")
-    def test_client_create_job(self, mock_client_info):
+    @patch("jobs.views.user_service.get_user_profile")
+    def test_job_detail_records_view(self, mock_user_profile):
+        """Without a Celery broker the detail GET records the view inline"""
+        mock_user_profile.return_value = self.client_info
+
+        url = reverse("jobs:job-detail", kwargs={"id": self.job.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.views_count, 1)
+        self.assertEqual(JobView.objects.filter(job=self.job).count(), 1)
+
+    def test_client_create_job(self):
         """Test POST /api/client/jobs/"""
-        mock_client_info.return_value = {
-            "id": self.user.id,
-            "username": "testuser"
-        }
+        # Client endpoints read request.user_id, which only JWTAuthentication sets
+        self.client.force_authenticate(user=None)
+        token = jwt.encode({"user_id": self.user.id}, settings.SECRET_KEY, algorithm="HS256")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
 
         url = reverse("jobs:client-job-create")
         data = {
             "title": "New Job",
             "description": "New Description",
+            "job_type": "fixed",
+            "budget_min": 100,
+            "budget_max": 500,
             "status": "draft"
         }
         response = self.client.post(url, data, format="json")
@@ -27,6 +27,8 @@ urlpatterns = [
     # Job Attachments
     path('client/jobs/<uuid:job_id>/attachments/', views.JobAttachmentUploadView.as_view(),
          name='upload-job-attachment'),
+    path('client/jobs/<uuid:job_id>/attachments/presign/', views.JobAttachmentPresignView.as_view(),
+         name='presign-job-attachment'),
     path('client/jobs/<uuid:job_id>/attachments/<int:attachment_id>/', views.JobAttachmentDeleteView.as_view(),
          name='delete-job-attachment'),
 
@@ -1,16 +1,29 @@
 # jobs/views.py
+import hashlib
 import logging
-from django.db.models import Avg, F, Q, Sum
+import os
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Page
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, Exists, F, OuterRef, Prefetch, Q, Sum, Window
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import filters, generics, status
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
 from .authentication import JWTAuthentication
-from .models import Job, JobAttachment, JobCategory, JobSave, JobView, Skill
+from .models import (
+    CATALOG_CACHE_TIMEOUT, JOB_CATEGORIES_CACHE_KEY, JOB_LIST_CACHE_KEY,
+    JOB_LIST_CACHE_TIMEOUT, JOB_LIST_VERSION_KEY, SKILLS_CACHE_KEY, Job, JobAttachment, JobCategory, JobSave, Skill
+)
 from .serializers import (
     JobAttachmentSerializer, JobCategorySerializer,
     JobCreateUpdateSerializer, JobDetailSerializer,
@@ -19,9 +32,49 @@ from .serializers import (
     SkillSerializer
 )
 from .services import user_service
+from .storage import MAX_ATTACHMENT_SIZE, attachment_key_prefix, presign_attachment_upload
 
 logger = logging.getLogger(__name__)
 
+# Category columns rendered by the nested JobCategorySerializer
+CATEGORY_FIELDS = ("category__id", "category__name", "category__description", "category__icon")
+
+# Columns read by JobListSerializer; keeps search_keywords and other wide fields off list queries
+JOB_LIST_FIELDS = (
+    "id", "title", "description", "client_id", "category", "job_type",
+    "experience_level", "estimated_duration", "budget_display", "remote_allowed",
+    "location", "is_featured", "is_urgent", "created_at", "views_count",
+    "applications_count", "deadline", "status",
+    *CATEGORY_FIELDS,
+)
+
+# Orderings accepted by JobListView's ?ordering= parameter
+_VALID_ORDERINGS = frozenset({
+    "created_at", "-created_at",
+    "budget_min", "-budget_min",
+    "deadline", "-deadline",
+    "views_count", "-views_count",
+    "applications_count", "-applications_count",
+})
+
+
+def skills_prefetch(lookup="skills"):
+    """Prefetch skills with only the columns SkillSerializer renders"""
+    return Prefetch(lookup, queryset=Skill.objects.only("id", "name", "category"))
+
+
+def job_list_cache_key(request):
+    """Versioned key for a job list response, independent of query parameter order"""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.blake2b(f"{request.get_host()}?{query}".encode(), digest_size=8).hexdigest()
+    version = cache.get_or_set(JOB_LIST_VERSION_KEY, 1, None)
+    return JOB_LIST_CACHE_KEY.format(version, digest)
+
+
+def get_base_url(request):
+    """Absolute scheme://host prefix, computed once per request for file URLs"""
+    return request.build_absolute_uri("/")[:-1]
+
 
 # ================= PAGINATION =================
 class CustomPageNumberPagination(PageNumberPagination):
@@ -30,6 +83,43 @@ class CustomPageNumberPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class WindowCountPagination(CustomPageNumberPagination):
+    """
+    Reads the total from a COUNT(*) OVER () annotation on the page rows
+    instead of a separate COUNT query, trading a slightly wider page
+    SELECT for one less scan of the filtered queryset.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        page_number = request.query_params.get(self.page_query_param) or 1
+        # DISTINCT is applied after the window, so the annotated total would count duplicates
+        if not page_size or queryset.query.distinct or page_number in self.last_page_strings:
+            return super().paginate_queryset(queryset, request, view)
+
+        try:
+            number = int(page_number)
+        except (TypeError, ValueError):
+            number = 0
+        if number < 1:
+            return super().paginate_queryset(queryset, request, view)
+
+        offset = (number - 1) * page_size
+        rows = list(queryset.annotate(_total=Window(Count("*")))[offset:offset + page_size])
+        if not rows:
+            # Empty result or page out of range; let the default path count and raise
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Fills the cached_property, so the paginator never issues its own COUNT
+        paginator.count = rows[0]._total
+        self.page = Page(rows, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+
 # ================= PUBLIC ENDPOINTS =================
 class JobCategoryListView(generics.ListAPIView):
     queryset = JobCategory.objects.filter(is_active=True)
@@ -37,6 +127,14 @@ class JobCategoryListView(generics.ListAPIView):
     pagination_class = None
     permission_classes = [AllowAny]
 
+    def list(self, request, *args, **kwargs):
+        data = cache.get_or_set(
+            JOB_CATEGORIES_CACHE_KEY,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+            CATALOG_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
 
 class SkillListView(generics.ListAPIView):
     queryset = Skill.objects.filter(is_active=True)
@@ -46,45 +144,57 @@ class SkillListView(generics.ListAPIView):
     pagination_class = None
     permission_classes = [AllowAny]
 
+    def list(self, request, *args, **kwargs):
+        # Only the unfiltered catalog is cached; searches go to the database
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            return super().list(request, *args, **kwargs)
+        data = cache.get_or_set(
+            SKILLS_CACHE_KEY,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+            CATALOG_CACHE_TIMEOUT,
+        )
+        return Response(data)
+
 
 class JobListView(generics.ListAPIView):
     serializer_class = JobListSerializer
-    pagination_class = CustomPageNumberPagination
+    pagination_class = WindowCountPagination
     permission_classes = [AllowAny]
 
     def get_queryset(self):
         queryset = Job.objects.filter(status="published") \
+            .only(*JOB_LIST_FIELDS) \
             .select_related("category") \
-            .prefetch_related("skills")
+            .prefetch_related(skills_prefetch())
+        params = self.request.query_params
 
         # Filters
-        search = self.request.query_params.get("search")
+        search = params.get("search")
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(search_keywords__icontains=search.lower())
-            )
+            # search_keywords is the lowercased title + description, so one column covers all three
+            queryset = queryset.filter(search_keywords__contains=search.lower())
 
-        category = self.request.query_params.get("category")
+        category = params.get("category")
         if category:
             queryset = queryset.filter(category_id=category)
 
-        job_type = self.request.query_params.get("job_type")
+        job_type = params.get("job_type")
         if job_type:
             queryset = queryset.filter(job_type=job_type)
 
-        experience_level = self.request.query_params.get("experience_level")
+        experience_level = params.get("experience_level")
         if experience_level:
             queryset = queryset.filter(experience_level=experience_level)
 
-        skills = self.request.query_params.get("skills")
+        skills = params.get("skills")
         if skills:
             skill_list = [s.strip() for s in skills.split(",")]
-            queryset = queryset.filter(skills__name__in=skill_list).distinct()
+            queryset = queryset.filter(Exists(
+                Job.skills.through.objects.filter(job_id=OuterRef("pk"), skill__name__in=skill_list)
+            ))
 
-        min_budget = self.request.query_params.get("min_budget")
-        max_budget = self.request.query_params.get("max_budget")
+        min_budget = params.get("min_budget")
+        max_budget = params.get("max_budget")
         if min_budget:
             queryset = queryset.filter(
                 Q(budget_min__gte=min_budget) | Q(hourly_rate_min__gte=min_budget)
@@ -94,35 +204,37 @@ class JobListView(generics.ListAPIView):
                 Q(budget_max__lte=max_budget) | Q(hourly_rate_max__lte=max_budget)
             )
 
-        if self.request.query_params.get("remote_only", "").lower() == "true":
+        if params.get("remote_only", "").lower() == "true":
             queryset = queryset.filter(remote_allowed=True)
 
-        location = self.request.query_params.get("location")
+        location = params.get("location")
         if location:
             queryset = queryset.filter(location__icontains=location)
 
-        if self.request.query_params.get("featured_only", "").lower() == "true":
+        if params.get("featured_only", "").lower() == "true":
             queryset = queryset.filter(is_featured=True)
 
         # Filter by client_id if provided (for inter-service communication)
-        client_id = self.request.query_params.get("client")
+        client_id = params.get("client")
         if client_id:
             queryset = queryset.filter(client_id=client_id)
 
-        ordering = self.request.query_params.get("ordering", "-created_at")
-        valid_orderings = [
-            "created_at", "-created_at",
-            "budget_min", "-budget_min",
-            "deadline", "-deadline",
-            "views_count", "-views_count",
-            "applications_count", "-applications_count",
-        ]
-        if ordering in valid_orderings:
+        ordering = params.get("ordering", "-created_at")
+        if ordering in _VALID_ORDERINGS:
             queryset = queryset.order_by(ordering)
 
         return queryset
 
     def list(self, request, *args, **kwargs):
+        # Anonymous first pages are shared; is_saved makes authenticated responses per-user
+        cache_key = None
+        if getattr(request, "user_id", None) is None and \
+                request.query_params.get(self.paginator.page_query_param, "1") == "1":
+            cache_key = job_list_cache_key(request)
+            data = cache.get(cache_key)
+            if data is not None:
+                return Response(data)
+
         queryset = self.filter_queryset(self.get_queryset())
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -134,7 +246,10 @@ class JobListView(generics.ListAPIView):
                 job.client_info = users_data.get(str(job.client_id))
 
             serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            response = self.get_paginated_response(serializer.data)
+            if cache_key:
+                cache.set(cache_key, response.data, JOB_LIST_CACHE_TIMEOUT)
+            return response
 
         # For non-paginated case
         user_ids = [job.client_id for job in queryset]
@@ -153,36 +268,28 @@ class JobDetailView(generics.RetrieveAPIView):
     permission_classes = [AllowAny]
 
     def get_queryset(self):
-        return Job.objects.select_related("category").prefetch_related(
-            "skills", "attachments", "milestones"
-        )
+        return Job.objects.select_related("category") \
+            .defer(
+                "search_keywords", "slug",
+                "category__is_active", "category__display_order",
+                "category__created_at", "category__updated_at",
+            ) \
+            .prefetch_related(skills_prefetch(), "attachments", "milestones")
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["base_url"] = get_base_url(self.request)
+        return context
 
     def retrieve(self, request, *args, **kwargs):
+        # Views are recorded by JobViewTrackingMiddleware once the response is built
         job = self.get_object()
-        self._track_job_view(job, request)
-        Job.objects.filter(id=job.id).update(views_count=F("views_count") + 1)
 
         # Use UserService to get client info
         job.client_info = user_service.get_user_profile(job.client_id)
 
         return Response(self.get_serializer(job).data)
 
-    def _track_job_view(self, job, request):
-        try:
-            JobView.objects.create(
-                job=job,
-                viewer_id=getattr(request, "user_id", None),
-                ip_address=self._get_client_ip(request),
-                user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                referrer=request.META.get("HTTP_REFERER", ""),
-            )
-        except Exception as e:
-            logger.error(f"Error tracking job view: {e}")
-
-    def _get_client_ip(self, request):
-        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-        return x_forwarded_for.split(",")[0] if x_forwarded_for else request.META.get("REMOTE_ADDR")
-
 
 # ================= CLIENT ENDPOINTS (AUTHENTICATED) =================
 class ClientJobListView(generics.ListAPIView):
@@ -192,7 +299,7 @@ class ClientJobListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        client_id = self.request.user.user_id
+        client_id = self.request.user_id
         queryset = Job.objects.filter(client_id=client_id) \
             .select_related("category") \
             .prefetch_related("skills")
@@ -216,7 +323,7 @@ class ClientJobCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated]
 
     def perform_create(self, serializer):
-        client_id = self.request.user.user_id
+        client_id = self.request.user_id
         job = serializer.save(client_id=client_id)
         if job.status == "published":
             job.published_at = timezone.now()
@@ -229,11 +336,16 @@ class ClientJobDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Job.objects.filter(client_id=self.request.user.user_id)
+        return Job.objects.filter(client_id=self.request.user_id)
 
     def get_serializer_class(self):
         return JobDetailSerializer if self.request.method == "GET" else JobCreateUpdateSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["base_url"] = get_base_url(self.request)
+        return context
+
     def retrieve(self, request, *args, **kwargs):
         job = self.get_object()
         job.client_info = user_service.get_user_profile(job.client_id)
@@ -246,19 +358,51 @@ class UpdateJobStatusView(APIView):
     authentication_classes = [JWTAuthentication]
 
     def patch(self, request, job_id):
-        client_id = request.user.user_id
-        job = get_object_or_404(Job, id=job_id, client_id=client_id)
-        old_status = job.status
-        serializer = JobStatusUpdateSerializer(job, data=request.data, partial=True)
-        if serializer.is_valid():
+        client_id = request.user_id
+        with transaction.atomic():
+            # Lock the row so concurrent transitions are validated against the committed status
+            job = get_object_or_404(Job.objects.select_for_update(), id=job_id, client_id=client_id)
+            serializer = JobStatusUpdateSerializer(job, data=request.data, partial=True)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
             new_status = serializer.validated_data["status"]
-            if new_status == "published" and old_status == "draft":
+            update_fields = ["status", "updated_at"]
+            if new_status == "published" and job.status == "draft":
                 job.published_at = timezone.now()
+                update_fields.append("published_at")
             elif new_status in ["completed", "cancelled"]:
                 job.closed_at = timezone.now()
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                update_fields.append("closed_at")
+            job.status = new_status
+            job.save(update_fields=update_fields)
+        return Response(serializer.data)
+
+
+class JobAttachmentPresignView(APIView):
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [JWTAuthentication]
+
+    def post(self, request, job_id):
+        client_id = request.user_id
+        job = get_object_or_404(Job.objects.only("id"), id=job_id, client_id=client_id)
+
+        if not settings.AWS_S3_ATTACHMENTS_BUCKET:
+            return Response({"error": "Direct uploads are not configured"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        filename = request.data.get("filename")
+        if not filename:
+            return Response({"error": "filename is required"}, status=status.HTTP_400_BAD_REQUEST)
+        content_type = request.data.get("content_type") or "application/octet-stream"
+
+        try:
+            presigned = presign_attachment_upload(job.id, filename, content_type)
+        except Exception as e:
+            logger.error(f"Error presigning attachment upload: {e}")
+            return Response({"error": "Could not create upload URL"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(presigned)
 
 
 class JobAttachmentUploadView(APIView):
@@ -266,14 +410,17 @@ class JobAttachmentUploadView(APIView):
     authentication_classes = [JWTAuthentication]
 
     def post(self, request, job_id):
-        client_id = request.user.user_id
+        client_id = request.user_id
         job = get_object_or_404(Job, id=job_id, client_id=client_id)
 
+        if "key" in request.data:
+            return self._record_uploaded(request, job)
+
         if "file" not in request.FILES:
             return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
 
         file = request.FILES["file"]
-        if file.size > 10 * 1024 * 1024:
+        if file.size > MAX_ATTACHMENT_SIZE:
             return Response({"error": "File size exceeds 10MB limit"}, status=status.HTTP_400_BAD_REQUEST)
 
         attachment = JobAttachment.objects.create(
@@ -284,7 +431,34 @@ class JobAttachmentUploadView(APIView):
             file_type=file.content_type,
             description=request.data.get("description", ""),
         )
-        serializer = JobAttachmentSerializer(attachment, context={"request": request})
+        return self._created(request, attachment)
+
+    def _record_uploaded(self, request, job):
+        """Store metadata for a file the client already uploaded via a presigned S3 post"""
+        key = request.data["key"]
+        if not key.startswith(attachment_key_prefix(job.id)):
+            return Response({"error": "Invalid upload key"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            size = int(request.data.get("size", 0))
+        except (TypeError, ValueError):
+            size = 0
+        if not 0 < size <= MAX_ATTACHMENT_SIZE:
+            return Response({"error": "Invalid file size"}, status=status.HTTP_400_BAD_REQUEST)
+
+        attachment = JobAttachment.objects.create(
+            job=job,
+            file=key,
+            filename=request.data.get("filename") or os.path.basename(key),
+            file_size=size,
+            file_type=request.data.get("content_type", "")[:50],
+            description=request.data.get("description", ""),
+        )
+        return self._created(request, attachment)
+
+    def _created(self, request, attachment):
+        serializer = JobAttachmentSerializer(
+            attachment, context={"request": request, "base_url": get_base_url(request)}
+        )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
@@ -293,7 +467,7 @@ class JobAttachmentDeleteView(APIView):
     authentication_classes = [JWTAuthentication]
 
     def delete(self, request, job_id, attachment_id):
-        client_id = request.user.user_id
+        client_id = request.user_id
         job = get_object_or_404(Job, id=job_id, client_id=client_id)
         attachment = get_object_or_404(JobAttachment, id=attachment_id, job=job)
         if attachment.file:
@@ -307,41 +481,45 @@ class ClientJobStatsView(APIView):
     authentication_classes = [JWTAuthentication]
 
     def get(self, request):
-        client_id = request.user.user_id
+        client_id = request.user_id
         jobs = Job.objects.filter(client_id=client_id)
-        stats = {
-            "total_jobs": jobs.count(),
-            "published_jobs": jobs.filter(status="published").count(),
-            "draft_jobs": jobs.filter(status="draft").count(),
-            "in_progress_jobs": jobs.filter(status="in_progress").count(),
-            "completed_jobs": jobs.filter(status="completed").count(),
-            "cancelled_jobs": jobs.filter(status="cancelled").count(),
-            "total_views": jobs.aggregate(total=Sum("views_count"))["total"] or 0,
-            "total_applications": jobs.aggregate(total=Sum("applications_count"))["total"] or 0,
-            "average_budget": jobs.filter(budget_max__isnull=False).aggregate(avg=Avg("budget_max"))["avg"] or 0,
-            "recent_activity": [
-                {
-                    "id": str(job.id),
-                    "title": job.title,
-                    "status": job.status,
-                    "updated_at": job.updated_at,
-                    "views_count": job.views_count,
-                    "applications_count": job.applications_count,
-                }
-                for job in jobs.order_by("-updated_at")[:5]
-            ],
-        }
+        # One conditional-aggregation query instead of a COUNT/SUM/AVG per figure
+        stats = jobs.aggregate(
+            total_jobs=Count("id"),
+            published_jobs=Count("id", filter=Q(status="published")),
+            draft_jobs=Count("id", filter=Q(status="draft")),
+            in_progress_jobs=Count("id", filter=Q(status="in_progress")),
+            completed_jobs=Count("id", filter=Q(status="completed")),
+            cancelled_jobs=Count("id", filter=Q(status="cancelled")),
+            total_views=Sum("views_count"),
+            total_applications=Sum("applications_count"),
+            average_budget=Avg("budget_max", filter=Q(budget_max__isnull=False)),
+        )
+        for key in ("total_views", "total_applications", "average_budget"):
+            stats[key] = stats[key] or 0
+        recent_activity = list(jobs.order_by("-updated_at").values(
+            "id", "title", "status", "updated_at", "views_count", "applications_count"
+        )[:5])
+        for job in recent_activity:
+            job["id"] = str(job["id"])
+        stats["recent_activity"] = recent_activity
         return Response(JobStatsSerializer(stats).data)
 
 
-class JobApplicationsView(APIView):
+class JobApplicationsView(generics.ListAPIView):
+    pagination_class = CustomPageNumberPagination
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
 
-    def get(self, request, job_id):
-        client_id = request.user.user_id
-        get_object_or_404(Job, id=job_id, client_id=client_id)
-        return Response({"results": [], "count": 0})
+    def get_queryset(self):
+        client_id = self.request.user_id
+        get_object_or_404(Job, id=self.kwargs["job_id"], client_id=client_id)
+        # Applications are not stored in this service yet
+        return []
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        return self.get_paginated_response(page)
 
 
 # ================= JOB SAVE/BOOKMARK =================
@@ -350,16 +528,21 @@ class JobSaveView(APIView):
     authentication_classes = [JWTAuthentication]
 
     def post(self, request, job_id):
-        user_id = request.user.user_id
-        job = get_object_or_404(Job, id=job_id, status="published")
-        job_save, created = JobSave.objects.get_or_create(job=job, user_id=user_id)
-        if created:
-            Job.objects.filter(id=job.id).update(saves_count=F("saves_count") + 1)
-            return Response({"message": "Job saved successfully"}, status=status.HTTP_201_CREATED)
-        return Response({"message": "Job already saved"}, status=status.HTTP_200_OK)
+        user_id = request.user_id
+        try:
+            with transaction.atomic():
+                # Bump the counter first; a duplicate insert below rolls it back
+                bumped = Job.objects.filter(id=job_id, status="published") \
+                    .update(saves_count=F("saves_count") + 1)
+                if not bumped:
+                    raise Http404
+                JobSave.objects.create(job_id=job_id, user_id=user_id)
+        except IntegrityError:
+            return Response({"message": "Job already saved"}, status=status.HTTP_200_OK)
+        return Response({"message": "Job saved successfully"}, status=status.HTTP_201_CREATED)
 
     def delete(self, request, job_id):
-        user_id = request.user.user_id
+        user_id = request.user_id
         job = get_object_or_404(Job, id=job_id)
         try:
             job_save = JobSave.objects.get(job=job, user_id=user_id)
@@ -370,25 +553,32 @@ class JobSaveView(APIView):
             return Response({"message": "Job was not saved"}, status=status.HTTP_404_NOT_FOUND)
 
 
-class SavedJobsListView(APIView):
+class SavedJobsListView(generics.ListAPIView):
+    serializer_class = JobListSerializer
+    pagination_class = CustomPageNumberPagination
     permission_classes = [IsAuthenticated]
     authentication_classes = [JWTAuthentication]
 
-    def get(self, request):
-        user_id = request.user.user_id
-        saved_jobs = JobSave.objects.filter(user_id=user_id) \
+    def get_queryset(self):
+        user_id = self.request.user_id
+        return JobSave.objects.filter(user_id=user_id, job__status="published") \
+            .order_by("-saved_at") \
             .select_related("job__category") \
-            .prefetch_related("job__skills")
-        jobs = [save.job for save in saved_jobs if save.job.status == "published"]
+            .only("job", *(f"job__{field}" for field in JOB_LIST_FIELDS)) \
+            .prefetch_related(skills_prefetch("job__skills"))
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        jobs = [save.job for save in page]
 
-        # Batch fetch client info for all jobs
+        # Batch fetch client info for the jobs on this page
         user_ids = [job.client_id for job in jobs]
         users_data = user_service.get_users_batch(user_ids)
         for job in jobs:
             job.client_info = users_data.get(str(job.client_id))
 
-        serializer = JobListSerializer(jobs, many=True, context={"request": request})
-        return Response(serializer.data)
+        serializer = self.get_serializer(jobs, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 # ================= HEALTH CHECK =================
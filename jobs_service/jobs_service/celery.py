@@ -0,0 +1,14 @@
+# jobs_service/jobs_service/celery.py
+import os
+from celery import Celery
+
+# Set Django settings module
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobs_service.settings')
+
+app = Celery('jobs_service')
+
+# Load configuration from Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Auto-discover tasks in all Django apps
+app.autodiscover_tasks()
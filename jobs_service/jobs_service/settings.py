@@ -56,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'jobs.middleware.JobViewTrackingMiddleware',
 ]
 
 ROOT_URLCONF = 'jobs_service.urls'
@@ -127,7 +128,8 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Media files
-MEDIA_URL = '/media/'
+# Point MEDIA_URL at the attachments bucket when uploads go through presigned S3 posts
+MEDIA_URL = os.getenv('MEDIA_URL', '/media/')
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # Default primary key field type
@@ -177,6 +179,20 @@ CORS_ALLOW_HEADERS = [
 USERS_SERVICE_URL = os.getenv('USERS_SERVICE_URL', 'http://localhost:8000')
 
 
+# S3 direct uploads for job attachments
+AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID', '')
+AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY', '')
+AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+AWS_S3_ATTACHMENTS_BUCKET = os.getenv('AWS_S3_ATTACHMENTS_BUCKET', '')
+
+
+# Celery (background analytics writes such as job view tracking). Without a broker the
+# tasks run inline in the web process; with one, start a worker (CELERY_WORKER=true in
+# scripts/entrypoint.sh runs it next to the web server).
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL')
+CELERY_TASK_IGNORE_RESULT = True
+
+
 # Logging Configuration
 LOGGING = {
     'version': 1,
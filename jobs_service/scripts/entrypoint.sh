@@ -127,5 +127,11 @@ python manage.py check --deploy || echo "Health check warnings found"
 
 echo -e "${GREEN}Jobs Service initialization completed!${NC}"
 
+# Start a Celery worker for background writes (job view tracking) next to the web process
+if [ "$CELERY_WORKER" = "true" ] && [ ! -z "$CELERY_BROKER_URL" ]; then
+    echo -e "${YELLOW}Starting Celery worker...${NC}"
+    celery -A jobs_service worker --loglevel=info &
+fi
+
 # Execute the main command
 exec "$@"
\ No newline at end of file
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -154,11 +155,25 @@ CORS_ALLOW_HEADERS = [
 # Channels configuration
 ASGI_APPLICATION = 'notification_service.asgi.application'
 
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-    },
-}
+# Set CHANNEL_REDIS_URL to share the layer across processes (needed for Celery-sent events).
+# A colocated Redis can be reached over its socket, e.g. unix:///var/run/redis/redis.sock
+CHANNEL_REDIS_URL = os.getenv('CHANNEL_REDIS_URL')
+
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
 
 # REST Framework configuration
 REST_FRAMEWORK = {
@@ -180,3 +195,8 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Static files
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Celery (channel fan-out for created notifications runs off the request thread).
+# Tasks only go to the worker when the cache and channel layer are shared (a non-local
+# CACHES backend plus CHANNEL_REDIS_URL); with the per-process defaults they run inline.
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True
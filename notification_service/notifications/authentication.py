@@ -1,5 +1,11 @@
 # notifications/authentication.py
+import base64
+import hashlib
+import hmac
 import jwt
+import orjson
+import threading
+import time
 from django.conf import settings
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
@@ -7,6 +13,143 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class AuthenticatedUser:
+    """User built from a verified JWT payload"""
+    __slots__ = ('id', 'user_id', 'username', 'email', 'account_types', 'is_authenticated')
+
+    def __init__(self, user_data):
+        self.id = str(user_data.get('user_id'))
+        self.user_id = self.id
+        self.username = user_data.get('username', '')
+        self.email = user_data.get('email', '')
+        self.account_types = user_data.get('account_types', [])
+        self.is_authenticated = True
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return f"User {self.username} ({self.user_id})"
+
+
+class ServiceUser:
+    """Caller authenticated with the shared service token"""
+    __slots__ = ()
+
+    id = 'service'
+    user_id = 'service'
+    is_authenticated = True
+    is_service = True
+    username = 'service'
+    email = 'service@system.com'
+
+    @property
+    def pk(self):
+        return self.id
+
+
+_SERVICE_USER = ServiceUser()
+
+# Users for verified JWTs keyed by the raw token. Entries live until the token's exp
+# or TOKEN_CACHE_TTL seconds, whichever comes first; failed verifications are never cached.
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX_SIZE = 10_000
+_TOKEN_CACHE = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+_SIGNER = None
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def _hmac_for_secret():
+    """Fresh HS256 HMAC for SECRET_KEY, copied from a keyed instance built once per secret"""
+    global _SIGNER
+    secret = settings.SECRET_KEY
+    if _SIGNER is None or _SIGNER[0] != secret:
+        _SIGNER = (secret, hmac.new(secret.encode(), digestmod=hashlib.sha256))
+    return _SIGNER[1].copy()
+
+
+def _fast_decode(token):
+    """Verify an HS256 JWT and return its payload.
+
+    Equivalent to jwt.decode(token, SECRET_KEY, algorithms=['HS256']) for the exp/nbf
+    claims we issue, without PyJWT's options machinery. Raises the same jwt exceptions.
+    """
+    try:
+        header_b64, payload_b64, signature_b64 = token.split('.')
+        signature = _b64decode(signature_b64)
+        header = orjson.loads(_b64decode(header_b64))
+    except (ValueError, orjson.JSONDecodeError):
+        raise jwt.DecodeError('Malformed token')
+    if not isinstance(header, dict) or header.get('alg') != 'HS256':
+        raise jwt.InvalidAlgorithmError('The specified alg value is not allowed')
+
+    signer = _hmac_for_secret()
+    signer.update(f'{header_b64}.{payload_b64}'.encode())
+    if not hmac.compare_digest(signer.digest(), signature):
+        raise jwt.InvalidSignatureError('Signature verification failed')
+
+    try:
+        payload = orjson.loads(_b64decode(payload_b64))
+    except (ValueError, orjson.JSONDecodeError):
+        raise jwt.DecodeError('Invalid payload')
+    if not isinstance(payload, dict):
+        raise jwt.DecodeError('Invalid payload')
+
+    now = time.time()
+    exp = payload.get('exp')
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise jwt.DecodeError('Expiration Time claim (exp) must be a number')
+        if exp <= now:
+            raise jwt.ExpiredSignatureError('Signature has expired')
+    nbf = payload.get('nbf')
+    if nbf is not None:
+        if not isinstance(nbf, (int, float)):
+            raise jwt.DecodeError('Not Before claim (nbf) must be a number')
+        if nbf > now:
+            raise jwt.ImmatureSignatureError('The token is not yet valid (nbf)')
+    return payload
+
+
+def _get_user_for_token(token):
+    """Return the AuthenticatedUser for a token, decoding it only on a cache miss"""
+    now = time.time()
+    hit = _TOKEN_CACHE.get(token)
+    if hit is not None:
+        user, expires_at = hit
+        if expires_at > now:
+            return user
+        _TOKEN_CACHE.pop(token, None)
+
+    payload = _fast_decode(token)
+    if not payload.get('user_id'):
+        raise AuthenticationFailed('Invalid token payload')
+
+    user = AuthenticatedUser(payload)
+    expires_at = min(payload.get('exp', now + TOKEN_CACHE_TTL), now + TOKEN_CACHE_TTL)
+    with _TOKEN_CACHE_LOCK:
+        if len(_TOKEN_CACHE) >= TOKEN_CACHE_MAX_SIZE:
+            # Dicts keep insertion order, so this drops the oldest entry
+            _TOKEN_CACHE.pop(next(iter(_TOKEN_CACHE)))
+        _TOKEN_CACHE[token] = (user, expires_at)
+    return user
+
+
+def decode_token(token):
+    """AuthenticatedUser for a raw JWT, or None when it does not verify"""
+    try:
+        return _get_user_for_token(token)
+    except (jwt.InvalidTokenError, AuthenticationFailed) as e:
+        logger.warning(f"Token rejected: {e}")
+        return None
+
 
 class ServiceAuthentication(BaseAuthentication):
     """Authentication for service-to-service communication"""
@@ -23,21 +166,7 @@ class ServiceAuthentication(BaseAuthentication):
         if token != service_token:
             raise AuthenticationFailed('Invalid service token')
 
-        # Return a simple service user object
-        class ServiceUser:
-            def __init__(self):
-                self.id = 'service'
-                self.user_id = 'service'
-                self.is_authenticated = True
-                self.is_service = True
-                self.username = 'service'
-                self.email = 'service@system.com'
-
-            @property
-            def pk(self):
-                return self.id
-
-        return (ServiceUser(), token)
+        return (_SERVICE_USER, token)
 
 
 class JWTAuthentication(BaseAuthentication):
@@ -52,32 +181,7 @@ class JWTAuthentication(BaseAuthentication):
         token = auth_header.split(' ')[1]
 
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            user_id = payload.get('user_id')
-
-            if not user_id:
-                raise AuthenticationFailed('Invalid token payload')
-
-            # Create a simple user object
-            class AuthenticatedUser:
-                def __init__(self, user_data):
-                    self.id = str(user_data.get('user_id'))
-                    self.user_id = str(user_data.get('user_id'))
-                    self.username = user_data.get('username', '')
-                    self.email = user_data.get('email', '')
-                    self.account_types = user_data.get('account_types', [])
-                    self.is_authenticated = True
-
-                @property
-                def pk(self):
-                    return self.id
-
-                def __str__(self):
-                    return f"User {self.username} ({self.user_id})"
-
-            user = AuthenticatedUser(payload)
-            return (user, token)
-
+            return (_get_user_for_token(token), token)
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed('Token has expired')
         except jwt.InvalidTokenError as e:
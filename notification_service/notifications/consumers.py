@@ -1,34 +1,63 @@
 
-import json
 import logging
-from urllib.parse import parse_qs
+from urllib.parse import unquote_plus
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
-from django.db import models
 
-from .authentication import JWTAuthentication
-from .models import Conversation, ConversationMember, Message
+from .authentication import decode_token
+from .models import ConversationMember, Message
 
 logger = logging.getLogger(__name__)
 
 
 # notifications/consumers.py
-import json
+import asyncio
 import logging
-from urllib.parse import parse_qs
+import orjson
+from urllib.parse import unquote_plus
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.db.models import Q
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
 from django.utils import timezone
 
-from .authentication import JWTAuthentication
-from .models import Conversation, ConversationMember, Message, MessageReadStatus
+from .authentication import decode_token
+from .models import (
+    ConversationMember, Message, MessageReadStatus,
+    USER_ONLINE, USER_PRESENCE_CACHE_TIMEOUT, user_presence_cache_key
+)
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on events coalesced into a single outbound WebSocket frame
+MAX_OUTBOUND_BATCH = 128
+
+# Constant parts of the error/success frames; only the message is encoded per call
+_ERROR_PREFIX = '{"type":"error","message":'
+_SUCCESS_PREFIX = '{"type":"success","message":'
+_BATCH_PREFIX = '{"type":"batch","events":['
+
+
+def _dumps(data):
+    return orjson.dumps(data).decode()
+
+
+def _envelope(prefix, message):
+    return prefix + _dumps(message) + '}'
+
+
+def _extract_token(query_string):
+    """Value of the 'token' parameter in a raw ASGI query string, or None"""
+    for part in query_string.split(b'&'):
+        if part.startswith(b'token='):
+            return unquote_plus(part[6:].decode()) or None
+    return None
+
 
 class MessagingConsumer(AsyncWebsocketConsumer):
     """WebSocket consumer for real-time messaging"""
@@ -36,21 +65,25 @@ class MessagingConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.user = None
-        self.user_groups = []
+        self.user_groups = set()
+        # conversation_id -> member user ids, refreshed on every send
+        self.conversation_members = {}
+        self.outbound = asyncio.Queue()
+        self.flush_task = None
+        # Strong references to fire-and-forget DB writes so they are not garbage collected
+        self.background_tasks = set()
 
     async def connect(self):
         """Handle WebSocket connection"""
-        # Parse token from query string
-        query_params = parse_qs(self.scope['query_string'].decode())
-        token = query_params.get('token', [None])[0]
+        token = _extract_token(self.scope['query_string'])
 
         if not token:
             logger.warning("No token provided in WebSocket connection")
             await self.close(code=4001)
             return
 
-        # Authenticate user
-        self.user = await self.authenticate_user(token)
+        # Authenticate user; token verification is pure CPU, so no thread hop is needed
+        self.user = decode_token(token)
         if not self.user:
             logger.warning("Failed to authenticate WebSocket user")
             await self.close(code=4002)
@@ -58,12 +91,16 @@ class MessagingConsumer(AsyncWebsocketConsumer):
 
         # Accept connection
         await self.accept()
+        self.flush_task = asyncio.create_task(self.flush_outbound())
 
         # Join user-specific groups (messaging + active conversations)
         await self.join_user_groups()
 
+        # A cache write instead of a DB write; offline notifications skip users marked online
+        await cache.aset(user_presence_cache_key(self.user.user_id), USER_ONLINE, USER_PRESENCE_CACHE_TIMEOUT)
+
         # Send connection confirmation
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=_dumps({
             'type': 'connection_established',
             'message': 'Connected to messaging',
             'user_id': self.user.user_id
@@ -73,19 +110,24 @@ class MessagingConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection"""
+        if self.flush_task:
+            self.flush_task.cancel()
+
         # Leave all groups
-        for group_name in self.user_groups:
+        for group_name in list(self.user_groups):
             await self.channel_layer.group_discard(group_name, self.channel_name)
 
-        # Update user's last seen
+        # last_seen_at is kept per conversation by mark_read; presence is just a cache entry
         if self.user:
-            await self.update_user_last_seen()
+            await cache.aset(
+                user_presence_cache_key(self.user.user_id), timezone.now(), USER_PRESENCE_CACHE_TIMEOUT
+            )
             logger.info(f"User {self.user.user_id} disconnected from messaging WebSocket")
 
     async def receive(self, text_data):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
 
             if message_type == 'send_message':
@@ -103,7 +145,7 @@ class MessagingConsumer(AsyncWebsocketConsumer):
             else:
                 await self.send_error('Unknown message type')
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             await self.send_error('Invalid JSON format')
         except Exception as e:
             logger.error(f"Error handling message: {e}")
@@ -122,22 +164,24 @@ class MessagingConsumer(AsyncWebsocketConsumer):
             await self.send_error('Missing required fields')
             return
 
-        # Verify access
-        if not await self.verify_conversation_access(conversation_id):
+        # Verify access, create and serialize the message in a single DB round trip
+        has_access, serialized, member_ids = await self.send_message_atomic(conversation_id, content, reply_to)
+        if not has_access:
             await self.send_error('Access denied to conversation')
             return
 
-        # Create message
-        message = await self.create_message(conversation_id, content, reply_to)
-        if message:
-            serialized = await self.serialize_message(message)
-            await self.channel_layer.group_send(
-                f"conversation_{conversation_id}",
-                {
-                    'type': 'chat_message',
-                    'message': serialized
-                }
-            )
+        if serialized is None:
+            await self.send_error('Failed to send message')
+            return
+
+        # Only a successful insert proves the member list is current
+        if member_ids:
+            self.conversation_members[conversation_id] = member_ids
+        # Encoded once here rather than once per receiving connection
+        await self.send_to_members(member_ids, {
+            'type': 'chat_message',
+            'text': _dumps({'type': 'message', 'data': serialized})
+        })
 
     async def handle_join_conversation(self, data):
         conversation_id = data.get('conversation_id')
@@ -151,8 +195,7 @@ class MessagingConsumer(AsyncWebsocketConsumer):
 
         group_name = f"conversation_{conversation_id}"
         await self.channel_layer.group_add(group_name, self.channel_name)
-        if group_name not in self.user_groups:
-            self.user_groups.append(group_name)
+        self.user_groups.add(group_name)
 
         await self.send_success('Joined conversation')
 
@@ -164,8 +207,7 @@ class MessagingConsumer(AsyncWebsocketConsumer):
 
         group_name = f"conversation_{conversation_id}"
         await self.channel_layer.group_discard(group_name, self.channel_name)
-        if group_name in self.user_groups:
-            self.user_groups.remove(group_name)
+        self.user_groups.discard(group_name)
 
         await self.send_success('Left conversation')
 
@@ -175,189 +217,206 @@ class MessagingConsumer(AsyncWebsocketConsumer):
             await self.send_error('Missing conversation_id')
             return
 
-        await self.mark_conversation_read(conversation_id)
-        await self.channel_layer.group_send(
-            f"conversation_{conversation_id}",
-            {
-                'type': 'messages_read',
-                'user_id': self.user.user_id,
-                'conversation_id': conversation_id
-            }
-        )
+        # Announce the receipt first; storing read statuses can take a while in long conversations
+        member_ids = await self.get_member_ids(conversation_id)
+        await self.send_to_members(member_ids, {
+            'type': 'messages_read',
+            'user_id': self.user.user_id,
+            'text': _dumps({
+                'type': 'read_receipt',
+                'data': {
+                    'user_id': self.user.user_id,
+                    'conversation_id': conversation_id
+                }
+            })
+        })
+
+        task = asyncio.create_task(self.mark_conversation_read(conversation_id))
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
 
     async def handle_typing(self, data, is_typing: bool):
         conversation_id = data.get('conversation_id')
         if not conversation_id:
             return
-        await self.channel_layer.group_send(
-            f"conversation_{conversation_id}",
-            {
-                'type': 'typing_indicator',
-                'user_id': self.user.user_id,
-                'conversation_id': conversation_id,
-                'is_typing': is_typing
-            }
-        )
+
+        member_ids = await self.get_member_ids(conversation_id)
+        await self.send_to_members(member_ids, {
+            'type': 'typing_indicator',
+            'user_id': self.user.user_id,
+            'text': _dumps({
+                'type': 'typing',
+                'data': {
+                    'user_id': self.user.user_id,
+                    'conversation_id': conversation_id,
+                    'is_typing': is_typing
+                }
+            })
+        })
+
+    async def get_member_ids(self, conversation_id):
+        """Member ids for routing, memoized on this connection"""
+        member_ids = self.conversation_members.get(conversation_id)
+        if member_ids is None:
+            member_ids = await self.get_conversation_member_ids(conversation_id)
+            self.conversation_members[conversation_id] = member_ids
+        return member_ids
+
+    async def send_to_members(self, member_ids, event):
+        """Route an event through each member's personal messaging group"""
+        await asyncio.gather(*(
+            self.channel_layer.group_send(f"messaging_{member_id}", event)
+            for member_id in member_ids
+        ))
 
     # -------------------------
     # WebSocket event handlers
     # -------------------------
 
     async def chat_message(self, event):
-        await self.send(text_data=json.dumps({'type': 'message', 'data': event['message']}))
+        """Consumers send the frame pre-encoded as 'text'; the REST services send raw message data"""
+        if 'text' in event:
+            self.outbound.put_nowait(event['text'])
+        else:
+            self.outbound.put_nowait(_dumps({'type': 'message', 'data': event['message']}))
 
     async def messages_read(self, event):
         if event['user_id'] != self.user.user_id:
-            await self.send(text_data=json.dumps({
-                'type': 'read_receipt',
-                'data': {
-                    'user_id': event['user_id'],
-                    'conversation_id': event['conversation_id']
-                }
-            }))
+            self.outbound.put_nowait(event['text'])
 
     async def typing_indicator(self, event):
         if event['user_id'] != self.user.user_id:
-            await self.send(text_data=json.dumps({
-                'type': 'typing',
-                'data': {
-                    'user_id': event['user_id'],
-                    'conversation_id': event['conversation_id'],
-                    'is_typing': event['is_typing']
-                }
-            }))
+            self.outbound.put_nowait(event['text'])
+
+    async def flush_outbound(self):
+        """Send queued frames, coalescing whatever is ready into one 'batch' frame"""
+        while True:
+            batch = [await self.outbound.get()]
+            while len(batch) < MAX_OUTBOUND_BATCH and not self.outbound.empty():
+                batch.append(self.outbound.get_nowait())
+
+            # A lone event goes out unwrapped, as before
+            if len(batch) == 1:
+                await self.send(text_data=batch[0])
+            else:
+                await self.send(text_data=_BATCH_PREFIX + ','.join(batch) + ']}')
 
     # -------------------------
     # Database operations
     # -------------------------
 
-    @database_sync_to_async
-    def authenticate_user(self, token):
-        try:
-            from django.http import HttpRequest
-            request = HttpRequest()
-            request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
-
-            auth = JWTAuthentication()
-            user_auth = auth.authenticate(request)
-            return user_auth[0] if user_auth else None
-        except Exception as e:
-            logger.error(f"Authentication error: {e}")
-            return None
-
     @database_sync_to_async
     def verify_conversation_access(self, conversation_id):
         try:
-            # Use ConversationMember for SQLite compatibility
-            conversation = Conversation.objects.filter(
-                id=conversation_id,
-                members__user_id=str(self.user.user_id),
-                is_active=True
-            ).first()
-            return conversation is not None
+            return ConversationMember.is_member(conversation_id, self.user.user_id)
         except Exception:
             return False
 
     @database_sync_to_async
-    def create_message(self, conversation_id, content, reply_to=None):
-        try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            reply_message = None
-            if reply_to:
-                try:
-                    reply_message = Message.objects.get(id=reply_to, conversation=conversation)
-                except Message.DoesNotExist:
-                    pass
-
-            message = Message.objects.create(
-                conversation=conversation,
-                sender_id=self.user.user_id,
-                content=content,
-                reply_to=reply_message
-            )
-
-            # Mark as read for sender
-            MessageReadStatus.objects.create(message=message, user_id=self.user.user_id)
+    def send_message_atomic(self, conversation_id, content, reply_to=None):
+        """Check membership from the member-id cache, then store and serialize the message in one transaction.
 
-            # Update unread counts for others
-            ConversationMember.objects.filter(conversation=conversation).exclude(
-                user_id=self.user.user_id
-            ).update(unread_count=models.F('unread_count') + 1)
-
-            return message
+        Returns (has_access, serialized_message, member_ids); the message and member ids are None
+        if the insert failed.
+        """
+        from .serializers import MessageSerializer
+        user_id = str(self.user.user_id)
+        try:
+            member_ids = ConversationMember.member_ids(conversation_id)
+            if user_id not in member_ids:
+                return False, None, []
+
+            with transaction.atomic():
+                # The serializer only shows the replied-to id, sender and a content preview
+                reply_message = None
+                if reply_to:
+                    try:
+                        reply_message = Message.objects.only('id', 'content', 'sender_id').get(
+                            id=reply_to, conversation_id=conversation_id
+                        )
+                    except (Message.DoesNotExist, ValidationError):
+                        pass
+
+                message = Message(
+                    conversation_id=conversation_id,
+                    sender_id=user_id,
+                    content=content,
+                    reply_to=reply_message
+                )
+                # Sent to the members below; signals.message_created still bumps the unread
+                # counts and last_message_at, and handles caches and notifications
+                message.realtime_delivered = True
+                message.save(force_insert=True)
+
+                # Mark as read for sender
+                MessageReadStatus.objects.create(message=message, user_id=user_id)
+
+                # reply_to is already attached; read_statuses is the only relation the serializer loads
+                prefetch_related_objects([message], 'read_statuses')
+                serialized = MessageSerializer(message).data
+
+            return True, serialized, member_ids
+        except ValidationError:
+            # Malformed conversation id
+            return False, None, []
         except Exception as e:
             logger.error(f"Error creating message: {e}")
-            return None
-
-    @database_sync_to_async
-    def serialize_message(self, message):
-        from .serializers import MessageSerializer
-        return MessageSerializer(message).data
+            return True, None, None
 
     @database_sync_to_async
     def mark_conversation_read(self, conversation_id):
+        """Mark the conversation read for this user; returns False if they are not a member"""
         try:
-            conversation = Conversation.objects.get(id=conversation_id)
-            unread_messages = Message.objects.filter(
-                conversation=conversation,
+            member_ids = ConversationMember.member_ids(conversation_id)
+            if str(self.user.user_id) not in member_ids:
+                return False
+
+            # Only ids are needed to build the read statuses; skip hydrating Message rows
+            unread_ids = list(Message.objects.filter(
+                conversation_id=conversation_id,
                 is_deleted=False
             ).exclude(
                 Q(sender_id=self.user.user_id) |
                 Q(read_statuses__user_id=self.user.user_id)
-            )
+            ).values_list('id', flat=True))
 
+            now = timezone.now()
             MessageReadStatus.objects.bulk_create([
-                MessageReadStatus(message=msg, user_id=self.user.user_id)
-                for msg in unread_messages
-            ], ignore_conflicts=True)
-
-            member = ConversationMember.objects.filter(conversation=conversation, user_id=self.user.user_id).first()
-            if member:
-                member.unread_count = 0
-                member.last_seen_at = timezone.now()
-                member.save(update_fields=['unread_count', 'last_seen_at'])
+                MessageReadStatus(message_id=message_id, user_id=self.user.user_id, read_at=now)
+                for message_id in unread_ids
+            ], ignore_conflicts=True, batch_size=1000)
+
+            ConversationMember.objects.filter(
+                conversation_id=conversation_id, user_id=self.user.user_id
+            ).update(unread_count=0, last_seen_at=now)
+            return True
         except Exception as e:
             logger.error(f"Error marking conversation as read: {e}")
+            return False
 
     @database_sync_to_async
-    def update_user_last_seen(self):
-        ConversationMember.objects.filter(user_id=self.user.user_id).update(last_seen_at=timezone.now())
-
-    @database_sync_to_async
-    def get_user_conversations(self):
+    def get_conversation_member_ids(self, conversation_id):
+        """Member ids of an active conversation, or [] if this user is not one of them"""
         try:
-            # Use ConversationMember for SQLite compatibility
-            conversations = Conversation.objects.filter(
-                members__user_id=str(self.user.user_id),
-                is_active=True
-            ).values_list('id', flat=True)
-            return [str(c) for c in conversations]
-        except Exception as e:
-            logger.error(f"Error getting user conversations: {e}")
+            member_ids = ConversationMember.member_ids(conversation_id)
+        except ValidationError:
             return []
+        return member_ids if str(self.user.user_id) in member_ids else []
 
     async def join_user_groups(self):
-        """Join general messaging + active conversations"""
-        # General messaging group
+        """Join the user's messaging group; conversation events are routed to it per member"""
         group = f"messaging_{self.user.user_id}"
         await self.channel_layer.group_add(group, self.channel_name)
-        self.user_groups.append(group)
-
-        # Active conversations
-        active_convs = await self.get_user_conversations()
-        for conv_id in active_convs:
-            group_name = f"conversation_{conv_id}"
-            await self.channel_layer.group_add(group_name, self.channel_name)
-            self.user_groups.append(group_name)
+        self.user_groups.add(group)
 
     # -------------------------
     # Utilities
     # -------------------------
     async def send_error(self, message):
-        await self.send(text_data=json.dumps({'type': 'error', 'message': message}))
+        await self.send(text_data=_envelope(_ERROR_PREFIX, message))
 
     async def send_success(self, message):
-        await self.send(text_data=json.dumps({'type': 'success', 'message': message}))
+        await self.send(text_data=_envelope(_SUCCESS_PREFIX, message))
 
 
 class NotificationConsumer(AsyncWebsocketConsumer):
@@ -370,16 +429,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
         """Handle WebSocket connection"""
-        # Get token from query params
-        token = self.scope['query_string'].decode().split('token=')[-1] if 'token=' in self.scope[
-            'query_string'].decode() else None
+        token = _extract_token(self.scope['query_string'])
 
         if not token:
             await self.close(code=4001)
             return
 
         # Authenticate user
-        self.user = await self.authenticate_user(token)
+        self.user = decode_token(token)
         if not self.user:
             await self.close(code=4002)
             return
@@ -409,7 +466,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(text_data)
+            data = orjson.loads(text_data)
             message_type = data.get('type')
 
             if message_type == 'mark_read':
@@ -419,7 +476,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             else:
                 await self.send_error('Unknown message type')
 
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             await self.send_error('Invalid JSON format')
         except Exception as e:
             logger.error(f"Error handling notification message: {e}")
@@ -447,30 +504,16 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     # WebSocket event handlers
     async def notification_message(self, event):
         """Send notification to WebSocket"""
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=_dumps({
             'type': 'notification',
             'data': event['notification']
         }))
 
-    # Database operations
-    @database_sync_to_async
-    def authenticate_user(self, token):
-        """Authenticate user with JWT token"""
-        try:
-            from django.http import HttpRequest
-            request = HttpRequest()
-            request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
-
-            auth = JWTAuthentication()
-            user_auth = auth.authenticate(request)
-
-            if user_auth:
-                return user_auth[0]
-            return None
-        except Exception as e:
-            logger.error(f"Authentication error: {e}")
-            return None
+    async def ai_chunk(self, event):
+        """Forward a streamed AI reply chunk; the payload is encoded by AIChatService"""
+        await self.send(text_data=event['text'])
 
+    # Database operations
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
         """Mark a notification as read"""
@@ -490,16 +533,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     def mark_all_notifications_read(self):
         """Mark all notifications as read"""
         try:
-            from django.utils import timezone
             from .models import Notification
 
             Notification.objects.filter(
                 recipient_id=self.user.user_id,
                 status__in=['pending', 'sent', 'delivered']
-            ).update(
-                status='read',
-                read_at=timezone.now()
-            )
+            ).mark_read()
             return True
         except Exception as e:
             logger.error(f"Error marking all notifications as read: {e}")
@@ -508,15 +547,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     # Utility methods
     async def send_error(self, message):
         """Send error message to WebSocket"""
-        await self.send(text_data=json.dumps({
-            'type': 'error',
-            'message': message
-        }))
+        await self.send(text_data=_envelope(_ERROR_PREFIX, message))
 
     async def send_success(self, message):
         """Send success message to WebSocket"""
-        await self.send(text_data=json.dumps({
-            'type': 'success',
-            'message': message
-        }))
+        await self.send(text_data=_envelope(_SUCCESS_PREFIX, message))
 
@@ -0,0 +1,23 @@
+# notifications/http_client.py
+"""Process-wide HTTP client for calls to the other Bidwise services.
+
+Sharing one client keeps connections alive between cache misses instead of
+opening a new TCP connection per request.
+"""
+import httpx
+from django.conf import settings
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+CLIENT = httpx.Client(
+    http2=HTTP2_AVAILABLE,
+    timeout=10,
+    limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+    headers={
+        'Authorization': f"Bearer {getattr(settings, 'SERVICE_TOKEN', 'secure-service-token-123')}",
+    },
+)
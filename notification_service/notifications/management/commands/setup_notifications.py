@@ -16,17 +16,19 @@ class Command(BaseCommand):
             ('push', 'Push Notification'),
         ]
 
-        created_channels = 0
+        existing_channels = set(NotificationChannel.objects.values_list('name', flat=True))
+        new_channels = [
+            NotificationChannel(name=name, is_active=True)
+            for name, _ in channels_data if name not in existing_channels
+        ]
+        NotificationChannel.objects.bulk_create(new_channels, ignore_conflicts=True)
+        created_channels = len(new_channels)
+
         for name, display_name in channels_data:
-            channel, created = NotificationChannel.objects.get_or_create(
-                name=name,
-                defaults={'is_active': True}
-            )
-            if created:
-                created_channels += 1
-                self.stdout.write(f'✓ Created channel: {display_name}')
-            else:
+            if name in existing_channels:
                 self.stdout.write(f'  Channel already exists: {display_name}')
+            else:
+                self.stdout.write(f'✓ Created channel: {display_name}')
 
         # Create notification types
         types_data = [
@@ -46,25 +48,31 @@ class Command(BaseCommand):
             ('system_maintenance', 'System Maintenance', 'System maintenance', 'The system will be under maintenance'),
         ]
 
-        # Get the web channel to set as default
-        web_channel = NotificationChannel.objects.get(name='web')
-        created_types = 0
-
-        for name, display_name, title, message in types_data:
-            notification_type, created = NotificationType.objects.get_or_create(
-                name=name,
-                defaults={
-                    'title_template': title,
-                    'message_template': message,
-                    'is_active': True
-                }
-            )
-            if created:
-                notification_type.default_channels.add(web_channel)
-                created_types += 1
-                self.stdout.write(f'✓ Created notification type: {display_name}')
-            else:
+        existing_types = set(NotificationType.objects.values_list('name', flat=True))
+        new_types = [
+            NotificationType(name=name, title_template=title, message_template=message, is_active=True)
+            for name, _, title, message in types_data if name not in existing_types
+        ]
+        NotificationType.objects.bulk_create(new_types, ignore_conflicts=True)
+        created_types = len(new_types)
+
+        # New types get the web channel as their default
+        if new_types:
+            web_channel_id = NotificationChannel.objects.values_list('id', flat=True).get(name='web')
+            new_type_ids = NotificationType.objects.filter(
+                name__in=[notification_type.name for notification_type in new_types]
+            ).values_list('id', flat=True)
+            DefaultChannel = NotificationType.default_channels.through
+            DefaultChannel.objects.bulk_create([
+                DefaultChannel(notificationtype_id=type_id, notificationchannel_id=web_channel_id)
+                for type_id in new_type_ids
+            ], ignore_conflicts=True)
+
+        for name, display_name, _, _ in types_data:
+            if name in existing_types:
                 self.stdout.write(f'  Notification type already exists: {display_name}')
+            else:
+                self.stdout.write(f'✓ Created notification type: {display_name}')
 
         # Create some test conversations and messages for development
         self.create_test_data()
@@ -80,7 +88,7 @@ class Command(BaseCommand):
 
     def create_test_data(self):
         """Create test conversations and messages for development"""
-        from ...models import Conversation, Message, ConversationMember
+        from ...models import Conversation, Message, ConversationMember, invalidate_conversation_members
         import json
 
         # Create a test conversation
@@ -96,12 +104,12 @@ class Command(BaseCommand):
 
         if created:
             # Create conversation members
-            for user_id in ['1', '2']:
-                ConversationMember.objects.get_or_create(
-                    conversation=conversation,
-                    user_id=user_id,
-                    defaults={'unread_count': 0}
-                )
+            ConversationMember.objects.bulk_create([
+                ConversationMember(conversation=conversation, user_id=user_id, unread_count=0)
+                for user_id in ['1', '2']
+            ], ignore_conflicts=True)
+            # bulk_create skips post_save, so clear the member-id cache here
+            invalidate_conversation_members(conversation.id)
 
             # Create some test messages
             test_messages = [
@@ -111,13 +119,15 @@ class Command(BaseCommand):
                 {'sender_id': '2', 'content': 'That sounds interesting! Tell me more about it.'},
             ]
 
-            for msg_data in test_messages:
-                Message.objects.create(
+            Message.objects.bulk_create([
+                Message(
                     conversation=conversation,
                     sender_id=msg_data['sender_id'],
                     content=msg_data['content'],
                     message_type='text'
                 )
+                for msg_data in test_messages
+            ])
 
             self.stdout.write('✓ Created test conversation with messages')
 
@@ -135,12 +145,12 @@ class Command(BaseCommand):
 
         if created:
             # Create conversation members
-            for user_id in ['1', '3']:
-                ConversationMember.objects.get_or_create(
-                    conversation=conversation2,
-                    user_id=user_id,
-                    defaults={'unread_count': 0}
-                )
+            ConversationMember.objects.bulk_create([
+                ConversationMember(conversation=conversation2, user_id=user_id, unread_count=0)
+                for user_id in ['1', '3']
+            ], ignore_conflicts=True)
+            # bulk_create skips post_save, so clear the member-id cache here
+            invalidate_conversation_members(conversation2.id)
 
             # Create some job-related messages
             job_messages = [
@@ -149,12 +159,14 @@ class Command(BaseCommand):
                 {'sender_id': '3', 'content': 'I have 5 years of experience with both technologies. I can show you some of my previous work.'},
             ]
 
-            for msg_data in job_messages:
-                Message.objects.create(
+            Message.objects.bulk_create([
+                Message(
                     conversation=conversation2,
                     sender_id=msg_data['sender_id'],
                     content=msg_data['content'],
                     message_type='text'
                 )
+                for msg_data in job_messages
+            ])
 
             self.stdout.write('✓ Created job inquiry conversation with messages')
\ No newline at end of file
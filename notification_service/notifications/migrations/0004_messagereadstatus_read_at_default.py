@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_alter_aiconversation_model_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='messagereadstatus',
+            name='read_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
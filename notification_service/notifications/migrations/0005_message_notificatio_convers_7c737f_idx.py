@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_messagereadstatus_read_at_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'is_deleted', 'created_at'], name='notificatio_convers_7c737f_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_message_notificatio_convers_7c737f_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='conversation',
+            name='notificatio_partici_ae5f98_idx',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0007_notification_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'sent', 'delivered'])), fields=['recipient_id', 'created_at'], name='notif_unread_ix'),
+        ),
+    ]
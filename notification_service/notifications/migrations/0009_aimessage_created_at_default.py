@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-16 17:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0008_notification_unread_partial_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aimessage',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -1,8 +1,40 @@
 # notifications/models.py
 import uuid
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
+CONVERSATION_MEMBERS_CACHE_TIMEOUT = 300
+NOTIFICATION_TYPE_CACHE_TIMEOUT = 3600
+AI_HISTORY_CACHE_TIMEOUT = 3600
+# Bounds how long a connection that died without disconnecting still counts as online
+USER_PRESENCE_CACHE_TIMEOUT = 86400
+# Presence value while the user has a messaging socket open; a disconnect stores the time instead
+USER_ONLINE = 'online'
+
+
+def conversation_members_cache_key(conversation_id):
+    return f"conversation_{conversation_id}_members"
+
+
+def notification_type_cache_key(name):
+    return f"notification_type_{name}"
+
+
+def ai_history_cache_key(conversation_id):
+    return f"ai_history_{conversation_id}"
+
+
+def user_presence_cache_key(user_id):
+    return f"user_{user_id}_last_seen"
+
+
+def invalidate_conversation_members(conversation_id):
+    """Drop the cached member ids once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(conversation_members_cache_key(conversation_id)))
+
 
 class NotificationChannel(models.Model):
     """Define different notification channels"""
@@ -57,6 +89,24 @@ class NotificationType(models.Model):
     def __str__(self):
         return self.get_name_display()
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        cache.delete(notification_type_cache_key(self.name))
+
+    def delete(self, *args, **kwargs):
+        cache.delete(notification_type_cache_key(self.name))
+        return super().delete(*args, **kwargs)
+
+    @classmethod
+    def get_cached(cls, name):
+        """Type by name from the cache; types are static config, so this skips a query per notification"""
+        key = notification_type_cache_key(name)
+        notification_type = cache.get(key)
+        if notification_type is None:
+            notification_type = cls.objects.get(name=name)
+            cache.set(key, notification_type, timeout=NOTIFICATION_TYPE_CACHE_TIMEOUT)
+        return notification_type
+
 
 class UserNotificationPreference(models.Model):
     """User preferences for notification types and channels"""
@@ -74,6 +124,19 @@ class UserNotificationPreference(models.Model):
         return f"{self.user_id} - {self.notification_type.name}"
 
 
+class NotificationQuerySet(models.QuerySet):
+    """Status transitions for many notifications in a single UPDATE"""
+
+    def mark_sent(self):
+        return self.update(status='sent', sent_at=timezone.now())
+
+    def mark_delivered(self):
+        return self.update(status='delivered', delivered_at=timezone.now())
+
+    def mark_read(self):
+        return self.exclude(status='read').update(status='read', read_at=timezone.now())
+
+
 class Notification(models.Model):
     """Individual notification instances"""
     PRIORITY_CHOICES = [
@@ -109,18 +172,27 @@ class Notification(models.Model):
     action_text = models.CharField(max_length=50, blank=True)
 
     # Timestamps
-    created_at = models.DateTimeField(auto_now_add=True)
+    # A plain default rather than auto_now_add so bulk fanout can share one timestamp per batch
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     sent_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
     read_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField(null=True, blank=True)
 
+    objects = NotificationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient_id', 'status']),
             models.Index(fields=['notification_type', 'created_at']),
             models.Index(fields=['status', 'created_at']),
+            # Unread badge/listing; read rows, the bulk of the table, stay out of this index
+            models.Index(
+                fields=['recipient_id', 'created_at'],
+                name='notif_unread_ix',
+                condition=models.Q(status__in=['pending', 'sent', 'delivered'])
+            ),
         ]
 
     def __str__(self):
@@ -185,7 +257,7 @@ class Conversation(models.Model):
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    participants = models.JSONField()  # List of user IDs
+    participants = models.JSONField()  # List of user IDs; denormalized, query membership via ConversationMember
     conversation_type = models.CharField(max_length=50, choices=CONVERSATION_TYPES, default='general')
 
     # Related entities
@@ -205,7 +277,6 @@ class Conversation(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=['participants']),
             models.Index(fields=['job_id', 'is_active']),
             models.Index(fields=['bid_id', 'is_active']),
             models.Index(fields=['last_message_at']),
@@ -214,6 +285,13 @@ class Conversation(models.Model):
     def __str__(self):
         return f"Conversation {self.id} - {self.title or 'No title'}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the post_save hook tell when is_active flipped
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
     def get_other_participant(self, current_user_id):
         """Get the other participant in a 2-person conversation"""
         participants = self.participants
@@ -256,6 +334,7 @@ class Message(models.Model):
         ordering = ['created_at']
         indexes = [
             models.Index(fields=['conversation', 'created_at']),
+            models.Index(fields=['conversation', 'is_deleted', 'created_at']),
             models.Index(fields=['sender_id', 'created_at']),
         ]
 
@@ -267,7 +346,8 @@ class MessageReadStatus(models.Model):
     """Track message read status per user"""
     message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name='read_statuses')
     user_id = models.CharField(max_length=100)
-    read_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add so batch inserts can stamp one shared time
+    read_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         unique_together = ['message', 'user_id']
@@ -307,6 +387,40 @@ class ConversationMember(models.Model):
     def __str__(self):
         return f"{self.user_id} in {self.conversation.id}"
 
+    @classmethod
+    def member_ids(cls, conversation_id):
+        """User ids of an active conversation's members, cached since membership is fixed at creation"""
+        return cache.get_or_set(
+            conversation_members_cache_key(conversation_id),
+            lambda: list(cls.objects.filter(
+                conversation_id=conversation_id,
+                conversation__is_active=True
+            ).values_list('user_id', flat=True)),
+            CONVERSATION_MEMBERS_CACHE_TIMEOUT
+        )
+
+    @classmethod
+    def is_member(cls, conversation_id, user_id):
+        """Whether user_id belongs to the active conversation, answered from the member-id cache"""
+        return str(user_id) in cls.member_ids(conversation_id)
+
+
+# Receivers live here rather than in signals.py so they are connected whenever the models load
+
+@receiver(post_save, sender=ConversationMember)
+@receiver(post_delete, sender=ConversationMember)
+def conversation_member_changed(sender, instance, **kwargs):
+    invalidate_conversation_members(instance.conversation_id)
+
+
+@receiver(post_save, sender=Conversation)
+def conversation_active_changed(sender, instance, created, **kwargs):
+    """member_ids only covers active conversations, so flipping is_active invalidates it"""
+    loaded_is_active = getattr(instance, '_loaded_is_active', instance.is_active)
+    if not created and instance.is_active != loaded_is_active:
+        invalidate_conversation_members(instance.id)
+    instance._loaded_is_active = instance.is_active
+
 
 # Add to your existing models.py
 
@@ -363,7 +477,8 @@ class AIMessage(models.Model):
     total_tokens = models.IntegerField(default=0)
 
     # Timestamps
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the instance is built, so a turn saved in one bulk_create keeps user-before-assistant order
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         ordering = ['created_at']
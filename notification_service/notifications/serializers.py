@@ -1,5 +1,7 @@
 # notifications/serializers.py
+from django.db import models
 from rest_framework import serializers
+from .services import UserService
 from .models import (
     Notification, NotificationType, NotificationChannel,
     UserNotificationPreference, Conversation, Message,
@@ -56,9 +58,20 @@ class NotificationCreateSerializer(serializers.Serializer):
     expires_at = serializers.DateTimeField(required=False)
 
 
+class MessageListSerializer(serializers.ListSerializer):
+    """Looks up every sender on the page once instead of once per message"""
+
+    def to_representation(self, data):
+        messages = list(data.all() if isinstance(data, models.Manager) else data)
+        self.context['sender_profiles'] = UserService.get_cached_user_profiles(
+            {message.sender_id for message in messages}
+        )
+        return [self.child.to_representation(message) for message in messages]
+
+
 class MessageSerializer(serializers.ModelSerializer):
     id = serializers.CharField(read_only=True)  # convert UUID to string
-    conversation = serializers.CharField(source='conversation.id', read_only=True)  # also as string
+    conversation = serializers.CharField(source='conversation_id', read_only=True)  # also as string, without loading the conversation
 
     sender_info = serializers.SerializerMethodField()
     reply_to_message = serializers.SerializerMethodField()
@@ -73,16 +86,16 @@ class MessageSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'read_by'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'sender_info', 'read_by']
-
+        list_serializer_class = MessageListSerializer
 
     def get_sender_info(self, obj):
         """Get sender information from users service"""
-        # This would normally call the users service
-        # For now, return basic info
+        # Filled in by MessageListSerializer; single messages fall back to basic info
+        profile = self.context.get('sender_profiles', {}).get(obj.sender_id) or {}
         return {
             'id': obj.sender_id,
-            'username': f'User {obj.sender_id}',
-            'profile_picture': None
+            'username': profile.get('username', f'User {obj.sender_id}'),
+            'profile_picture': profile.get('profile_picture')
         }
 
     def get_reply_to_message(self, obj):
@@ -123,7 +136,14 @@ class ConversationSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Get the last message in conversation"""
-        last_message = obj.messages.filter(is_deleted=False).last()
+        if hasattr(obj, 'latest_messages'):
+            # Attached by the list view's windowed prefetch
+            last_message = obj.latest_messages[0] if obj.latest_messages else None
+        else:
+            # Backward scan of the (conversation, is_deleted, created_at) index, LIMIT 1
+            last_message = obj.messages.filter(is_deleted=False).order_by('-created_at').only(
+                'id', 'content', 'sender_id', 'created_at', 'message_type'
+            ).first()
         if last_message:
             return {
                 'id': str(last_message.id),
@@ -138,6 +158,9 @@ class ConversationSerializer(serializers.ModelSerializer):
         """Get unread count for current user"""
         request = self.context.get('request')
         if request and hasattr(request, 'user') and hasattr(request.user, 'user_id'):
+            if hasattr(obj, 'user_members'):
+                # Attached by the list view, already filtered to this user
+                return obj.user_members[0].unread_count if obj.user_members else 0
             user_id = str(request.user.user_id)
             member = obj.members.filter(user_id=user_id).first()
             return member.unread_count if member else 0
@@ -208,9 +231,10 @@ class AIMessageSerializer(serializers.ModelSerializer):
         ]
 
 
-class AIConversationSerializer(serializers.ModelSerializer):
-    ai_messages = AIMessageSerializer(many=True, read_only=True)
-    message_count = serializers.SerializerMethodField()
+class AIConversationListSerializer(serializers.ModelSerializer):
+    """Conversation summary for lists; the message history is only sent by the detail view"""
+    # Maintained by AIChatService.generate_response, so no COUNT(*) per conversation
+    message_count = serializers.IntegerField(source='total_messages', read_only=True)
 
     class Meta:
         model = AIConversation
@@ -218,11 +242,15 @@ class AIConversationSerializer(serializers.ModelSerializer):
             'id', 'user_id', 'title', 'is_active', 'model_name',
             'temperature', 'max_tokens', 'total_tokens_used',
             'total_messages', 'created_at', 'updated_at',
-            'last_message_at', 'ai_messages', 'message_count'
+            'last_message_at', 'message_count'
         ]
 
-    def get_message_count(self, obj):
-        return obj.ai_messages.count()
+
+class AIConversationSerializer(AIConversationListSerializer):
+    ai_messages = AIMessageSerializer(many=True, read_only=True)
+
+    class Meta(AIConversationListSerializer.Meta):
+        fields = AIConversationListSerializer.Meta.fields + ['ai_messages']
 
 
 class AIChatRequestSerializer(serializers.Serializer):
@@ -3,22 +3,44 @@ import os
 for var in ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy',
             'ALL_PROXY', 'all_proxy', 'NO_PROXY', 'no_proxy']:
     os.environ.pop(var, None)
+import asyncio
+import functools
 import logging
 import os
+import threading
+import time
 
 import httpx
-import requests
 import hashlib
+import orjson
 from typing import Dict, List, Optional, Any
 from django.conf import settings
 from django.core.cache import cache
+from django.template.loader import get_template
+from django.db import transaction
+from django.db.models import F, Prefetch
 from django.utils import timezone
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
+
+from .http_client import CLIENT
 from .models import Notification, UserNotificationPreference, NotificationChannel
 
 logger = logging.getLogger(__name__)
 
+# Tag indexes outlive every entry they point at; invalidation deletes them early
+TAG_INDEX_TIMEOUT = 86400
+
+_email_template = None
+
+
+def get_email_template():
+    """Notification email template, loaded and compiled once per process"""
+    global _email_template
+    if _email_template is None:
+        _email_template = get_template('notifications/email_notification.html')
+    return _email_template
+
 
 class CacheManager:
     """Centralized cache management"""
@@ -33,6 +55,110 @@ class CacheManager:
         """Generate hash for cache key"""
         return hashlib.md5(data.encode()).hexdigest()[:12]
 
+    @staticmethod
+    def get_or_set_single_flight(key, compute, timeout, lock_timeout=5, wait=0.05):
+        """Like cache.get_or_set, but when the key expires only one caller recomputes it"""
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        lock_key = f"{key}:lock"
+        if cache.add(lock_key, 1, timeout=lock_timeout):
+            try:
+                value = compute()
+                cache.set(key, value, timeout=timeout)
+            finally:
+                cache.delete(lock_key)
+            return value
+
+        # Someone else is rebuilding it; give them a moment before falling back to the DB
+        time.sleep(wait)
+        value = cache.get(key)
+        return value if value is not None else compute()
+
+    @staticmethod
+    def get_tag_key(tag: str) -> str:
+        """Cache key of the set holding every key written under a tag"""
+        return f"tag:{tag}"
+
+    @staticmethod
+    def cache_with_tags(key, value, tags, timeout):
+        """Cache a value and record its key under each tag"""
+        CacheManager.cache_many_with_tags({key: value}, {key: tags}, timeout)
+
+    @staticmethod
+    def cache_many_with_tags(data: Dict[str, Any], tags_by_key: Dict[str, List[str]], timeout):
+        """Cache several values and record each key under its tags"""
+        cache.set_many(data, timeout=timeout)
+
+        keys_by_tag = {}
+        for key, tags in tags_by_key.items():
+            for tag in tags:
+                keys_by_tag.setdefault(tag, set()).add(key)
+
+        client = getattr(cache, 'client', None)
+        if hasattr(client, 'make_key'):
+            # django-redis: SADD the stored key names so invalidation can UNLINK them directly
+            pipeline = client.get_client(write=True).pipeline(transaction=False)
+            for tag, keys in keys_by_tag.items():
+                tag_key = client.make_key(CacheManager.get_tag_key(tag))
+                pipeline.sadd(tag_key, *(client.make_key(key) for key in keys))
+                pipeline.expire(tag_key, TAG_INDEX_TIMEOUT)
+            pipeline.execute()
+            return
+
+        # Other backends: keep the index as a plain set value (not atomic, fine for local caches)
+        tag_keys = {CacheManager.get_tag_key(tag): tag for tag in keys_by_tag}
+        indexes = cache.get_many(list(tag_keys))
+        cache.set_many(
+            {tag_key: indexes.get(tag_key, set()) | keys_by_tag[tag] for tag_key, tag in tag_keys.items()},
+            timeout=TAG_INDEX_TIMEOUT
+        )
+
+    @staticmethod
+    def invalidate_tags(tags):
+        """Delete every key recorded under any of the tags, along with the tag indexes"""
+        if not tags:
+            return
+        tag_keys = [CacheManager.get_tag_key(tag) for tag in tags]
+
+        client = getattr(cache, 'client', None)
+        if hasattr(client, 'make_key'):
+            # django-redis: SMEMBERS for all tags in one round-trip, then one UNLINK of members and tags
+            redis_client = client.get_client(write=True)
+            stored_tag_keys = [client.make_key(tag_key) for tag_key in tag_keys]
+            pipeline = redis_client.pipeline(transaction=False)
+            for stored_tag_key in stored_tag_keys:
+                pipeline.smembers(stored_tag_key)
+            members = set().union(*pipeline.execute())
+            redis_client.unlink(*members, *stored_tag_keys)
+            return
+
+        indexes = cache.get_many(tag_keys)
+        cache.delete_many([key for keys in indexes.values() for key in keys] + tag_keys)
+
+    @staticmethod
+    def invalidate_tag(tag: str):
+        """Delete every key recorded under a tag"""
+        CacheManager.invalidate_tags([tag])
+
+    @staticmethod
+    def invalidate_patterns(patterns):
+        """Invalidate keys matching any of the patterns, unlinking them in one Redis pipeline"""
+        client = getattr(cache, 'client', None)
+        if not hasattr(client, 'make_pattern'):
+            for pattern in patterns:
+                CacheManager.invalidate_pattern(pattern)
+            return
+
+        # django-redis: SCAN for each pattern, then a single non-blocking UNLINK round-trip
+        redis_client = client.get_client(write=True)
+        pipeline = redis_client.pipeline(transaction=False)
+        for pattern in patterns:
+            for key in redis_client.scan_iter(match=client.make_pattern(pattern), count=500):
+                pipeline.unlink(key)
+        pipeline.execute()
+
     @staticmethod
     def invalidate_pattern(pattern: str):
         """Invalidate cache keys matching pattern"""
@@ -56,54 +182,65 @@ class NotificationService:
             # Cache key for user preferences
             user_prefs_key = CacheManager.get_cache_key("user_prefs", notification.recipient_id,
                                                         notification.notification_type.id)
-            preferences = cache.get(user_prefs_key)
-
-            if preferences is None:
-                # Get user preferences
-                preferences = UserNotificationPreference.objects.filter(
+            preferences = CacheManager.get_or_set_single_flight(
+                user_prefs_key,
+                # Active channels are filtered inside the prefetch and cached with each preference
+                lambda: list(UserNotificationPreference.objects.filter(
                     user_id=notification.recipient_id,
                     notification_type=notification.notification_type,
                     is_enabled=True
-                ).prefetch_related('channels')
-
-                # Cache preferences
-                cache.set(user_prefs_key, list(preferences), timeout=self.cache_timeout)
+                ).only('id').prefetch_related(Prefetch(
+                    'channels',
+                    queryset=NotificationChannel.objects.filter(is_active=True),
+                    to_attr='active_channels'
+                ))),
+                timeout=self.cache_timeout
+            )
 
             if preferences:
                 # Use user preferences
                 channels_to_use = []
                 for pref in preferences:
-                    channels_to_use.extend(pref.channels.filter(is_active=True))
+                    channels_to_use.extend(pref.active_channels)
             else:
                 # Use default channels for notification type
                 default_channels_key = CacheManager.get_cache_key("default_channels", notification.notification_type.id)
-                channels_to_use = cache.get(default_channels_key)
-
-                if channels_to_use is None:
-                    channels_to_use = notification.notification_type.default_channels.filter(is_active=True)
-                    cache.set(default_channels_key, list(channels_to_use), timeout=3600)  # Cache for 1 hour
-
-            # Send via each channel
-            for channel in channels_to_use:
-                if channel.name == 'web':
-                    self._send_web_notification(notification)
-                elif channel.name == 'email':
-                    self._send_email_notification(notification)
-                elif channel.name == 'sms':
-                    self._send_sms_notification(notification)
-                elif channel.name == 'push':
-                    self._send_push_notification(notification)
+                channels_to_use = CacheManager.get_or_set_single_flight(
+                    default_channels_key,
+                    lambda: list(notification.notification_type.default_channels.filter(is_active=True)),
+                    timeout=3600  # Cache for 1 hour
+                )
+
+            # Channels are independent, so send them concurrently: latency is the slowest channel, not the sum
+            senders = {
+                'web': self._send_web_notification,
+                'email': sync_to_async(self._send_email_notification, thread_sensitive=False),
+                'sms': sync_to_async(self._send_sms_notification, thread_sensitive=False),
+                'push': sync_to_async(self._send_push_notification, thread_sensitive=False),
+            }
+            sends = [senders[channel.name](notification) for channel in channels_to_use if channel.name in senders]
+            if not sends:
+                # Nothing delivered: leave the row pending and the user's caches untouched
+                return
+            async_to_sync(self._gather_sends)(sends)
 
             # Mark as sent
             notification.mark_as_sent()
 
-            # Invalidate user notification caches
-            self._invalidate_user_notification_cache(notification.recipient_id)
+            # Invalidate user notification caches once the status change is committed
+            transaction.on_commit(lambda: self._invalidate_user_notification_cache(notification.recipient_id))
 
         except Exception as e:
             logger.error(f"Error sending notification {notification.id}: {e}")
 
-    def _send_web_notification(self, notification):
+    @staticmethod
+    async def _gather_sends(sends):
+        # One channel failing must not cancel the others
+        for result in await asyncio.gather(*sends, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Error sending notification via channel: {result}")
+
+    async def _send_web_notification(self, notification):
         """Send web notification via WebSocket"""
         if self.channel_layer:
             try:
@@ -120,7 +257,7 @@ class NotificationService:
                     'created_at': notification.created_at.isoformat(),
                 }
 
-                async_to_sync(self.channel_layer.group_send)(
+                await self.channel_layer.group_send(
                     f"notifications_{notification.recipient_id}",
                     {
                         'type': 'notification_message',
@@ -137,27 +274,16 @@ class NotificationService:
         """Send email notification with caching"""
         try:
             # Get user email from cache first
-            user_service = UserService()
-            user_data = user_service.get_user_profile(notification.recipient_id)
+            user_data = get_user_service().get_user_profile(notification.recipient_id)
 
             if user_data and user_data.get('email'):
                 from django.core.mail import send_mail
-                from django.template.loader import render_to_string
-
-                # Cache email template rendering
-                template_cache_key = CacheManager.get_cache_key(
-                    "email_template",
-                    notification.notification_type.name,
-                    CacheManager.get_hash_key(str(notification.data))
-                )
 
-                html_message = cache.get(template_cache_key)
-                if html_message is None:
-                    html_message = render_to_string('notifications/ email_notification.html', {
-                        'notification': notification,
-                        'user_data': user_data
-                    })
-                    cache.set(template_cache_key, html_message, timeout=3600)
+                # Rendered per recipient: the output includes user_data, so it can't be shared across users
+                html_message = get_email_template().render({
+                    'notification': notification,
+                    'user_data': user_data
+                })
 
                 send_mail(
                     subject=notification.title,
@@ -186,14 +312,9 @@ class NotificationService:
         pass
 
     def _invalidate_user_notification_cache(self, user_id):
-        """Invalidate all notification-related caches for a user"""
-        patterns = [
-            f"user_{user_id}_notifications_*",
-            f"user_{user_id}_notification_stats*",
-            f"user_prefs_{user_id}_*"
-        ]
-        for pattern in patterns:
-            CacheManager.invalidate_pattern(pattern)
+        """Invalidate the user's notification list and stats caches"""
+        # Preferences don't change when a notification is sent, so their cache is left alone
+        CacheManager.invalidate_tag(f"user:{user_id}:notifications")
 
 
 class UserService:
@@ -201,9 +322,9 @@ class UserService:
 
     def __init__(self):
         self.base_url = getattr(settings, 'USERS_SERVICE_URL', 'http://users_service:8000')
-        self.service_token = getattr(settings, 'SERVICE_TOKEN', 'secure-service-token-123')
         self.timeout = 10
         self.cache_timeout = 1800  # 30 minutes for user data
+        self.batch_size = 200  # user ids per batch request
 
     def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user profile from Users service with caching"""
@@ -214,17 +335,13 @@ class UserService:
             return cached_profile
 
         try:
-            response = requests.get(
+            response = CLIENT.get(
                 f"{self.base_url}/api/service/users/{user_id}/profile/",
-                headers={
-                    'Authorization': f'Bearer {self.service_token}',
-                    'Content-Type': 'application/json'
-                },
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                user_data = response.json()
+                user_data = orjson.loads(response.content)
                 # Cache user profile data
                 cache.set(cache_key, user_data, timeout=self.cache_timeout)
                 return user_data
@@ -232,48 +349,47 @@ class UserService:
                 logger.error(f"Failed to fetch user {user_id}: {response.status_code}")
                 return None
 
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching user {user_id}: {e}")
             return None
 
+    @staticmethod
+    def get_cached_user_profiles(user_ids) -> Dict[str, Dict]:
+        """Profiles already in cache, fetched with a single get_many; never calls the Users service"""
+        cached = cache.get_many([f"user_profile_{user_id}" for user_id in user_ids])
+        return {
+            user_id: cached[f"user_profile_{user_id}"]
+            for user_id in user_ids
+            if cached.get(f"user_profile_{user_id}")
+        }
+
     def get_multiple_user_profiles(self, user_ids: List[str]) -> Dict[str, Dict]:
         """Get multiple user profiles with batch caching"""
-        results = {}
-        uncached_ids = []
-
-        # Check cache for each user
-        for user_id in user_ids:
-            cache_key = f"user_profile_{user_id}"
-            cached_profile = cache.get(cache_key)
-            if cached_profile:
-                results[user_id] = cached_profile
-            else:
-                uncached_ids.append(user_id)
+        user_ids = list(dict.fromkeys(user_ids))
+        results = self.get_cached_user_profiles(user_ids)
+        uncached_ids = [user_id for user_id in user_ids if user_id not in results]
 
-        # Fetch uncached profiles in batch
-        if uncached_ids:
+        # Fetch uncached profiles in batches, keeping each request body bounded
+        for start in range(0, len(uncached_ids), self.batch_size):
             try:
-                response = requests.post(
+                response = CLIENT.post(
                     f"{self.base_url}/api/service/users/profiles/batch/",
-                    headers={
-                        'Authorization': f'Bearer {self.service_token}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={'user_ids': uncached_ids},
+                    content=orjson.dumps({'user_ids': uncached_ids[start:start + self.batch_size]}),
+                    headers={'Content-Type': 'application/json'},
                     timeout=self.timeout
                 )
 
                 if response.status_code == 200:
-                    batch_data = response.json()
-                    for user_id, user_data in batch_data.items():
-                        # Cache each profile
-                        cache_key = f"user_profile_{user_id}"
-                        cache.set(cache_key, user_data, timeout=self.cache_timeout)
-                        results[user_id] = user_data
+                    batch_data = orjson.loads(response.content)
+                    results.update(batch_data)
+                    cache.set_many(
+                        {f"user_profile_{user_id}": user_data for user_id, user_data in batch_data.items()},
+                        timeout=self.cache_timeout
+                    )
                 else:
                     logger.error(f"Failed to fetch batch users: {response.status_code}")
 
-            except requests.RequestException as e:
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
                 logger.error(f"Error fetching batch users: {e}")
 
         return results
@@ -281,8 +397,7 @@ class UserService:
     def invalidate_user_cache(self, user_id: str):
         """Invalidate user-related cache entries"""
         patterns = [f"user_profile_{user_id}*", f"user_{user_id}_*"]
-        for pattern in patterns:
-            CacheManager.invalidate_pattern(pattern)
+        CacheManager.invalidate_patterns(patterns)
 
 
 class MessagingService:
@@ -292,6 +407,10 @@ class MessagingService:
         self.channel_layer = get_channel_layer()
         self.cache_timeout = 300  # 5 minutes for messaging data
 
+    async def _group_send_many(self, groups, event):
+        """Send one event to several groups from a single event-loop entry"""
+        await asyncio.gather(*(self.channel_layer.group_send(group, event) for group in groups))
+
     def send_message_notification(self, message):
         """Send real-time message notification with caching"""
         try:
@@ -309,27 +428,20 @@ class MessagingService:
                 'created_at': message.created_at.isoformat(),
                 'is_edited': message.is_edited,
             }
-            cache.set(message_cache_key, message_data, timeout=self.cache_timeout)
-
-            # Send to conversation group
-            async_to_sync(self.channel_layer.group_send)(
-                f"conversation_{conversation.id}",
-                {
-                    'type': 'chat_message',
-                    'message': message_data
-                }
+            CacheManager.cache_with_tags(
+                message_cache_key, message_data, [f"conversation:{conversation.id}"], self.cache_timeout
             )
 
-            # Send to individual messaging groups for offline users
-            for participant_id in conversation.participants:
-                if str(participant_id) != str(message.sender_id):
-                    async_to_sync(self.channel_layer.group_send)(
-                        f"messaging_{participant_id}",
-                        {
-                            'type': 'chat_message',
-                            'message': message_data
-                        }
-                    )
+            # Conversation group plus each other participant's messaging group
+            groups = [f"conversation_{conversation.id}"] + [
+                f"messaging_{participant_id}"
+                for participant_id in conversation.participants
+                if str(participant_id) != str(message.sender_id)
+            ]
+            async_to_sync(self._group_send_many)(groups, {
+                'type': 'chat_message',
+                'message': message_data
+            })
 
             # Invalidate conversation caches
             self._invalidate_conversation_cache(conversation.id)
@@ -369,13 +481,10 @@ class MessagingService:
                 }
             )
 
-            # Invalidate related caches
-            self._invalidate_conversation_cache(conversation.id)
-
-            # Invalidate search caches for all participants
-            for participant_id in conversation.participants:
-                search_pattern = f"message_search_{participant_id}_*"
-                CacheManager.invalidate_pattern(search_pattern)
+            # Invalidate related caches, including search caches for all participants
+            CacheManager.invalidate_tags([f"conversation:{conversation.id}"] + [
+                f"user:{participant_id}:message_search" for participant_id in conversation.participants
+            ])
 
             logger.info(f"Message update sent for {message.id}: {update_type}")
 
@@ -384,48 +493,59 @@ class MessagingService:
 
     def get_conversation_last_messages(self, conversation_ids: List[str]) -> Dict[str, Dict]:
         """Get last messages for multiple conversations with caching"""
-        results = {}
+        from django.db.models import F, Window
+        from django.db.models.functions import RowNumber
+        from .models import Message
 
-        for conversation_id in conversation_ids:
-            cache_key = f"conversation_{conversation_id}_last_message"
-            cached_message = cache.get(cache_key)
+        keys = {f"conversation_{conversation_id}_last_message": conversation_id for conversation_id in conversation_ids}
+        cached = cache.get_many(list(keys))
+        results = {keys[key]: message_data for key, message_data in cached.items() if message_data}
 
-            if cached_message:
-                results[conversation_id] = cached_message
-            else:
-                # Fetch from database
-                from .models import Message
-                try:
-                    last_message = Message.objects.filter(
-                        conversation_id=conversation_id,
-                        is_deleted=False
-                    ).order_by('-created_at').first()
-
-                    if last_message:
-                        message_data = {
-                            'id': str(last_message.id),
-                            'content': last_message.content,
-                            'sender_id': last_message.sender_id,
-                            'created_at': last_message.created_at.isoformat(),
-                            'message_type': last_message.message_type
-                        }
-                        # Cache for 5 minutes
-                        cache.set(cache_key, message_data, timeout=300)
-                        results[conversation_id] = message_data
-
-                except Exception as e:
-                    logger.error(f"Error fetching last message for conversation {conversation_id}: {e}")
+        missing = {str(conversation_id): conversation_id for conversation_id in conversation_ids if conversation_id not in results}
+        if missing:
+            try:
+                # Newest message per conversation for all misses in one query
+                last_messages = Message.objects.filter(
+                    conversation_id__in=list(missing),
+                    is_deleted=False
+                ).annotate(
+                    row_number=Window(
+                        RowNumber(),
+                        partition_by=F('conversation_id'),
+                        order_by=F('created_at').desc()
+                    )
+                ).filter(row_number=1).only(
+                    'id', 'conversation_id', 'content', 'sender_id', 'created_at', 'message_type'
+                )
+
+                to_cache = {}
+                for last_message in last_messages:
+                    conversation_id = missing[str(last_message.conversation_id)]
+                    message_data = {
+                        'id': str(last_message.id),
+                        'content': last_message.content,
+                        'sender_id': last_message.sender_id,
+                        'created_at': last_message.created_at.isoformat(),
+                        'message_type': last_message.message_type
+                    }
+                    results[conversation_id] = message_data
+                    to_cache[f"conversation_{conversation_id}_last_message"] = message_data
+
+                # Cache for 5 minutes
+                CacheManager.cache_many_with_tags(
+                    to_cache,
+                    {key: [f"conversation:{keys[key]}"] for key in to_cache},
+                    timeout=300
+                )
+
+            except Exception as e:
+                logger.error(f"Error fetching last messages for conversations {list(missing)}: {e}")
 
         return results
 
     def _invalidate_conversation_cache(self, conversation_id):
         """Invalidate conversation-related cache entries"""
-        patterns = [
-            f"conversation_{conversation_id}_*",
-            f"*_conversation_{conversation_id}_*"
-        ]
-        for pattern in patterns:
-            CacheManager.invalidate_pattern(pattern)
+        CacheManager.invalidate_tag(f"conversation:{conversation_id}")
 
 
 class JobService:
@@ -433,7 +553,6 @@ class JobService:
 
     def __init__(self):
         self.base_url = getattr(settings, 'JOBS_SERVICE_URL', 'http://jobs_service:8001')
-        self.service_token = getattr(settings, 'SERVICE_TOKEN', 'secure-service-token-123')
         self.timeout = 10
         self.cache_timeout = 3600  # 1 hour for job data
 
@@ -446,17 +565,13 @@ class JobService:
             return cached_job
 
         try:
-            response = requests.get(
+            response = CLIENT.get(
                 f"{self.base_url}/api/service/jobs/{job_id}/",
-                headers={
-                    'Authorization': f'Bearer {self.service_token}',
-                    'Content-Type': 'application/json'
-                },
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                job_data = response.json()
+                job_data = orjson.loads(response.content)
                 # Cache job data
                 cache.set(cache_key, job_data, timeout=self.cache_timeout)
                 return job_data
@@ -464,15 +579,14 @@ class JobService:
                 logger.error(f"Failed to fetch job {job_id}: {response.status_code}")
                 return None
 
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching job {job_id}: {e}")
             return None
 
     def invalidate_job_cache(self, job_id: str):
         """Invalidate job-related cache entries"""
         patterns = [f"job_details_{job_id}*", f"job_{job_id}_*"]
-        for pattern in patterns:
-            CacheManager.invalidate_pattern(pattern)
+        CacheManager.invalidate_patterns(patterns)
 
 
 class BidService:
@@ -480,7 +594,6 @@ class BidService:
 
     def __init__(self):
         self.base_url = getattr(settings, 'BIDS_SERVICE_URL', 'http://bids_service:8002')
-        self.service_token = getattr(settings, 'SERVICE_TOKEN', 'secure-service-token-123')
         self.timeout = 10
         self.cache_timeout = 1800  # 30 minutes for bid data
 
@@ -493,17 +606,13 @@ class BidService:
             return cached_bid
 
         try:
-            response = requests.get(
+            response = CLIENT.get(
                 f"{self.base_url}/api/service/bids/{bid_id}/",
-                headers={
-                    'Authorization': f'Bearer {self.service_token}',
-                    'Content-Type': 'application/json'
-                },
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                bid_data = response.json()
+                bid_data = orjson.loads(response.content)
                 # Cache bid data
                 cache.set(cache_key, bid_data, timeout=self.cache_timeout)
                 return bid_data
@@ -511,23 +620,22 @@ class BidService:
                 logger.error(f"Failed to fetch bid {bid_id}: {response.status_code}")
                 return None
 
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching bid {bid_id}: {e}")
             return None
 
     def invalidate_bid_cache(self, bid_id: str):
         """Invalidate bid-related cache entries"""
         patterns = [f"bid_details_{bid_id}*", f"bid_{bid_id}_*"]
-        for pattern in patterns:
-            CacheManager.invalidate_pattern(pattern)
+        CacheManager.invalidate_patterns(patterns)
 
 
 class CacheWarmupService:
     """Service to warm up frequently accessed data"""
 
     def __init__(self):
-        self.user_service = UserService()
-        self.messaging_service = MessagingService()
+        self.user_service = get_user_service()
+        self.messaging_service = get_messaging_service()
 
     def warm_up_user_data(self, user_id: str):
         """Pre-cache frequently accessed user data"""
@@ -544,7 +652,9 @@ class CacheWarmupService:
 
             # Cache conversation IDs list
             cache_key = f"user_{user_id}_active_conversations"
-            cache.set(cache_key, list(user_conversations), timeout=1800)
+            CacheManager.cache_with_tags(
+                cache_key, list(user_conversations), [f"user:{user_id}:conversations"], timeout=1800
+            )
 
             # Warm up last messages for these conversations
             self.messaging_service.get_conversation_last_messages(
@@ -562,31 +672,35 @@ class CacheWarmupService:
             from .models import Conversation, Message
 
             # Get conversation
-            conversation = Conversation.objects.get(id=conversation_id)
+            conversation = Conversation.objects.only('id', 'participants').get(id=conversation_id)
 
             # Warm up participant profiles
             self.user_service.get_multiple_user_profiles(conversation.participants)
 
-            # Cache recent messages
+            # Cache recent messages, built from plain rows rather than Message instances
             recent_messages = Message.objects.filter(
                 conversation=conversation,
                 is_deleted=False
-            ).order_by('-created_at')[:50]
-
-            messages_data = []
-            for message in recent_messages:
-                message_data = {
-                    'id': str(message.id),
-                    'content': message.content,
-                    'sender_id': message.sender_id,
-                    'created_at': message.created_at.isoformat(),
-                    'message_type': message.message_type,
-                    'is_edited': message.is_edited
+            ).order_by('-created_at').values_list(
+                'id', 'content', 'sender_id', 'created_at', 'message_type', 'is_edited'
+            )[:50]
+
+            messages_data = [
+                {
+                    'id': str(message_id),
+                    'content': content,
+                    'sender_id': sender_id,
+                    'created_at': created_at.isoformat(),
+                    'message_type': message_type,
+                    'is_edited': is_edited
                 }
-                messages_data.append(message_data)
+                for message_id, content, sender_id, created_at, message_type, is_edited in recent_messages
+            ]
 
             cache_key = f"conversation_{conversation_id}_recent_messages"
-            cache.set(cache_key, messages_data, timeout=600)
+            CacheManager.cache_with_tags(
+                cache_key, messages_data, [f"conversation:{conversation_id}"], timeout=600
+            )
 
             logger.info(f"Warmed up cache for conversation {conversation_id}")
 
@@ -622,8 +736,7 @@ def invalidate_all_user_caches(user_id: str):
         f"user_profile_{user_id}*",
         f"*_{user_id}_*"
     ]
-    for pattern in patterns:
-        CacheManager.invalidate_pattern(pattern)
+    CacheManager.invalidate_patterns(patterns)
 
 
 # Add to your existing services.py
@@ -633,7 +746,7 @@ from openai import OpenAI
 
 from .models import (
     Notification, UserNotificationPreference, NotificationChannel,
-    AIConversation, AIMessage
+    AIConversation, AIMessage, AI_HISTORY_CACHE_TIMEOUT, ai_history_cache_key
 )
 
 logger = logging.getLogger(__name__)
@@ -649,6 +762,24 @@ import google.generativeai as genai
 # from openai import OpenAI
 
 
+# Active AI conversations keyed by (conversation_id, user_id), so follow-up turns skip the lookup query.
+# Per process and short-lived: another worker may see a deleted conversation for up to the TTL.
+AI_CONVERSATION_CACHE_TTL = 60
+AI_CONVERSATION_CACHE_MAX_SIZE = 1024
+_AI_CONVERSATION_CACHE = {}
+_AI_CONVERSATION_CACHE_LOCK = threading.Lock()
+
+
+def _remember_ai_conversation(conversation):
+    with _AI_CONVERSATION_CACHE_LOCK:
+        if len(_AI_CONVERSATION_CACHE) >= AI_CONVERSATION_CACHE_MAX_SIZE:
+            # Dicts keep insertion order, so this drops the oldest entry
+            _AI_CONVERSATION_CACHE.pop(next(iter(_AI_CONVERSATION_CACHE)))
+        _AI_CONVERSATION_CACHE[(str(conversation.id), str(conversation.user_id))] = (
+            conversation, time.monotonic() + AI_CONVERSATION_CACHE_TTL
+        )
+
+
 class AIChatService:
     """Service for handling AI chat interactions with Google Gemini"""
 
@@ -665,48 +796,62 @@ class AIChatService:
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
         self.default_temperature = 0.7
         self.default_max_tokens = 8192
+        self.channel_layer = get_channel_layer()
 
         logger.info("AIChatService initialized successfully with Gemini 2.0")
 
     def get_or_create_conversation(self, user_id, conversation_id=None):
         """Get existing AI conversation or create new one"""
         if conversation_id:
+            hit = _AI_CONVERSATION_CACHE.get((str(conversation_id), str(user_id)))
+            if hit is not None and hit[1] > time.monotonic():
+                return hit[0]
+
             try:
                 conversation = AIConversation.objects.get(
                     id=conversation_id,
                     user_id=user_id,
                     is_active=True
                 )
+                _remember_ai_conversation(conversation)
                 return conversation
             except AIConversation.DoesNotExist:
                 pass
 
-        return AIConversation.objects.create(
+        conversation = AIConversation.objects.create(
             user_id=user_id,
             title=f"AI Chat - {timezone.now().strftime('%Y-%m-%d %H:%M')}",
             model_name='gemini-pro'
         )
+        _remember_ai_conversation(conversation)
+        return conversation
 
     def get_conversation_history(self, conversation):
         """Build message history for Gemini format"""
+        history_key = ai_history_cache_key(conversation.id)
+        history = cache.get(history_key)
+        if history is not None:
+            return history
+
         messages = AIMessage.objects.filter(
             conversation=conversation
-        ).order_by('created_at')
+        ).order_by('created_at').values_list('role', 'content')
 
         # Gemini format: list of {'role': 'user'/'model', 'parts': [text]}
         history = []
-        for msg in messages:
-            if msg.role == 'user':
+        for role, content in messages:
+            if role == 'user':
                 history.append({
                     'role': 'user',
-                    'parts': [msg.content]
+                    'parts': [content]
                 })
-            elif msg.role == 'assistant':
+            elif role == 'assistant':
                 history.append({
                     'role': 'model',  # Gemini uses 'model' instead of 'assistant'
-                    'parts': [msg.content]
+                    'parts': [content]
                 })
 
+        cache.set(history_key, history, timeout=AI_HISTORY_CACHE_TIMEOUT)
         return history
 
     def generate_response(self, user_message, user_id, conversation_id=None, system_prompt=None):
@@ -714,39 +859,41 @@ class AIChatService:
         try:
             conversation = self.get_or_create_conversation(user_id, conversation_id)
 
-            # Save user message
-            user_msg = AIMessage.objects.create(
+            # Saved together with the reply below; created_at is stamped now so it sorts first
+            user_msg = AIMessage(
                 conversation=conversation,
                 role='user',
                 content=user_message
             )
 
-            # Build message history
+            # Build message history (everything before this turn)
             history = self.get_conversation_history(conversation)
 
-            logger.info(f"Calling Gemini API with {len(history)} messages")
+            logger.info(f"Calling Gemini API with {len(history) + 1} messages")
 
             # Start chat with history
-            chat = self.model.start_chat(history=history[:-1] if len(history) > 1 else [])
+            chat = self.model.start_chat(history=history)
 
             # Add system instructions if this is the first message
             prompt = user_message
-            if len(history) == 1 and system_prompt:
+            if not history and system_prompt:
                 prompt = f"{system_prompt}\n\nUser: {user_message}"
-            elif len(history) == 1:
+            elif not history:
                 prompt = f"You are a helpful AI assistant for a freelance platform. Help users with their questions about jobs, bids, projects, and general platform usage.\n\nUser: {user_message}"
 
-            # Generate response
-            response = chat.send_message(prompt)
-            ai_message_content = response.text
+            # Stream the response, forwarding each chunk to the user's notification socket as it arrives
+            chunks = []
+            for chunk in chat.send_message(prompt, stream=True):
+                chunks.append(chunk.text)
+                self._push_ai_chunk(user_id, conversation.id, chunk.text)
+            ai_message_content = ''.join(chunks)
 
             # Gemini doesn't provide token counts in the same way, estimate them
             prompt_tokens = len(prompt.split()) * 1.3  # rough estimate
             completion_tokens = len(ai_message_content.split()) * 1.3
             total_tokens = int(prompt_tokens + completion_tokens)
 
-            # Save AI response
-            ai_msg = AIMessage.objects.create(
+            ai_msg = AIMessage(
                 conversation=conversation,
                 role='assistant',
                 content=ai_message_content,
@@ -755,11 +902,20 @@ class AIChatService:
                 total_tokens=total_tokens
             )
 
-            # Update conversation stats
-            conversation.total_tokens_used += total_tokens
-            conversation.total_messages += 2
-            conversation.last_message_at = timezone.now()
-            conversation.save(update_fields=['total_tokens_used', 'total_messages', 'last_message_at'])
+            # Both messages and the stats in one transaction; F() keeps concurrent turns from losing counts
+            with transaction.atomic():
+                AIMessage.objects.bulk_create([user_msg, ai_msg])
+                AIConversation.objects.filter(id=conversation.id).update(
+                    total_tokens_used=F('total_tokens_used') + total_tokens,
+                    total_messages=F('total_messages') + 2,
+                    last_message_at=timezone.now()
+                )
+
+            # Extend the cached history with this turn so the next one doesn't reread every message
+            cache.set(ai_history_cache_key(conversation.id), history + [
+                {'role': 'user', 'parts': [user_message]},
+                {'role': 'model', 'parts': [ai_message_content]},
+            ], timeout=AI_HISTORY_CACHE_TIMEOUT)
 
             logger.info(f"Response generated successfully: ~{total_tokens} tokens")
 
@@ -780,6 +936,25 @@ class AIChatService:
             logger.error(traceback.format_exc())
             raise
 
+    def _push_ai_chunk(self, user_id, conversation_id, delta):
+        """Send a partial AI reply to the user's notifications WebSocket"""
+        if not self.channel_layer:
+            return
+        try:
+            async_to_sync(self.channel_layer.group_send)(
+                f"notifications_{user_id}",
+                {
+                    'type': 'ai_chunk',
+                    'text': orjson.dumps({
+                        'type': 'ai_chunk',
+                        'conversation_id': str(conversation_id),
+                        'delta': delta
+                    }).decode()
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error streaming AI chunk to user {user_id}: {e}")
+
     def delete_conversation(self, conversation_id, user_id):
         """Delete an AI conversation"""
         try:
@@ -789,6 +964,8 @@ class AIChatService:
             )
             conversation.is_active = False
             conversation.save(update_fields=['is_active'])
+            cache.delete(ai_history_cache_key(conversation.id))
+            _AI_CONVERSATION_CACHE.pop((str(conversation.id), str(user_id)), None)
             return True
         except AIConversation.DoesNotExist:
             return False
@@ -798,4 +975,26 @@ class AIChatService:
         return AIConversation.objects.filter(
             user_id=user_id,
             is_active=True
-        ).order_by('-last_message_at')[:limit]
\ No newline at end of file
+        ).order_by('-last_message_at')[:limit]
+
+
+# Shared service instances; they hold no per-request state, so one per process is enough
+@functools.cache
+def get_notification_service():
+    return NotificationService()
+
+
+@functools.cache
+def get_user_service():
+    return UserService()
+
+
+@functools.cache
+def get_messaging_service():
+    return MessagingService()
+
+
+@functools.cache
+def get_ai_chat_service():
+    """Configures Gemini once per process; raises ValueError (uncached) if no API key is set"""
+    return AIChatService()
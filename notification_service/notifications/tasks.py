@@ -1,14 +1,88 @@
 
+import asyncio
+
+from asgiref.sync import async_to_sync
 from celery import shared_task
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
 from django.utils import timezone
 from datetime import timedelta
-from .models import Message, Conversation, ConversationMember
-from .services import MessagingService
+from .models import (
+    Message, ConversationMember, Notification, NotificationType,
+    USER_ONLINE, user_presence_cache_key
+)
+from .services import CacheManager, get_messaging_service, get_notification_service, get_user_service
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def workers_share_state():
+    """Whether a worker's cache invalidations and group sends reach this process's clients.
+
+    Checked on every call rather than memoized, so settings overrides and layers configured
+    after import are picked up; both lookups return already-built backends.
+    """
+    per_process_cache = isinstance(caches['default'], (LocMemCache, DummyCache))
+    return not per_process_cache and not isinstance(get_channel_layer(), InMemoryChannelLayer)
+
+
+def enqueue(task, *args):
+    """Queue a task for a worker, or run it here when the cache or channel layer is per-process"""
+    if workers_share_state():
+        try:
+            task.delay(*args)
+            return
+        except Exception as e:
+            logger.error(f"Could not queue {task.name}{args}, running inline: {e}")
+    task(*args)
+
+
+async def _fanout(groups, event):
+    """Send one event to every group from a single event-loop entry"""
+    channel_layer = get_channel_layer()
+    await asyncio.gather(*(channel_layer.group_send(group, event) for group in groups))
+
+
+async def _send_each(sends):
+    """Send each (group, event) pair from a single event-loop entry"""
+    channel_layer = get_channel_layer()
+    await asyncio.gather(*(channel_layer.group_send(group, event) for group, event in sends))
+
+
+def push_created_notifications(notifications):
+    """Push new notifications to their recipients' sockets and invalidate their notification caches.
+
+    Bulk-created rows don't go through NotificationService.send_notification, so their
+    creators call this instead.
+    """
+    async_to_sync(_send_each)([
+        (f"notifications_{notification.recipient_id}", {
+            'type': 'notification_message',
+            'notification': {
+                'id': str(notification.id),
+                'title': notification.title,
+                'message': notification.message,
+                'type': notification.notification_type.name,
+                'priority': notification.priority,
+                'status': notification.status,
+                'data': notification.data,
+                'action_url': notification.action_url,
+                'action_text': notification.action_text,
+                'created_at': notification.created_at.isoformat(),
+            }
+        })
+        for notification in notifications
+    ])
+
+    # Invalidate user notification caches
+    CacheManager.invalidate_tags(list({
+        f"user:{notification.recipient_id}:notifications" for notification in notifications
+    }))
+
+
 @shared_task
 def cleanup_old_messages():
     """Clean up old deleted messages"""
@@ -32,12 +106,22 @@ def cleanup_old_messages():
         raise
 
 
+@shared_task(acks_late=True)
+def send_notification_task(notification_id):
+    """Deliver a created notification through its channels"""
+    notification = Notification.objects.select_related('notification_type').filter(id=notification_id).first()
+    if notification is None:
+        logger.warning(f"Notification {notification_id} no longer exists, skipping send")
+        return
+
+    get_notification_service().send_notification(notification)
+
+
 @shared_task
 def update_user_status(user_id, status):
     """Update user online/offline status"""
     try:
-        messaging_service = MessagingService()
-        messaging_service.notify_user_status_change(user_id, status)
+        get_messaging_service().notify_user_status_change(user_id, status)
 
         logger.info(f"Updated user {user_id} status to {status}")
 
@@ -46,6 +130,13 @@ def update_user_status(user_id, status):
         raise
 
 
+def _is_offline(last_seen, cutoff_time):
+    """Whether a cached presence value means the user has been away since before the cutoff"""
+    if last_seen is None:
+        return True
+    return last_seen != USER_ONLINE and last_seen < cutoff_time
+
+
 @shared_task
 def send_offline_message_notifications():
     """Send notifications for messages to offline users"""
@@ -53,41 +144,143 @@ def send_offline_message_notifications():
         from .models import Notification, NotificationType
 
         # Get users with unread messages who haven't been online recently
-        cutoff_time = timezone.now() - timedelta(minutes=15)
+        now = timezone.now()
+        cutoff_time = now - timedelta(minutes=15)
 
-        offline_members = ConversationMember.objects.filter(
+        members = list(ConversationMember.objects.filter(
             unread_count__gt=0,
             last_seen_at__lt=cutoff_time
-        ).select_related('conversation')
+        ).select_related('conversation'))
+
+        # last_seen_at only moves when a conversation is read, so also skip anyone the
+        # messaging socket reports as connected or recently disconnected
+        presence = cache.get_many(list({user_presence_cache_key(member.user_id) for member in members}))
+        offline_members = [
+            member for member in members
+            if _is_offline(presence.get(user_presence_cache_key(member.user_id)), cutoff_time)
+        ]
+
+        notification_type = NotificationType.get_cached('new_message')
 
-        notification_type = NotificationType.objects.get(name='new_message')
+        # One query for every (recipient, conversation) that already has an open notification
+        already_notified = set(Notification.objects.filter(
+            recipient_id__in={member.user_id for member in offline_members},
+            notification_type=notification_type,
+            status__in=['pending', 'sent', 'delivered']
+        ).values_list('recipient_id', 'data__conversation_id'))
 
-        for member in offline_members:
-            # Check if notification already exists
-            existing = Notification.objects.filter(
+        notifications = [
+            Notification(
                 recipient_id=member.user_id,
                 notification_type=notification_type,
-                data__conversation_id=str(member.conversation.id),
-                status__in=['pending', 'sent', 'delivered']
-            ).exists()
-
-            if not existing:
-                Notification.objects.create(
-                    recipient_id=member.user_id,
-                    notification_type=notification_type,
-                    title=f'You have {member.unread_count} unread message(s)',
-                    message=f'New messages in "{member.conversation.title}"',
-                    data={
-                        'conversation_id': str(member.conversation.id),
-                        'unread_count': member.unread_count
-                    },
-                    action_url=f'/messages/{member.conversation.id}',
-                    action_text='View Messages',
-                    priority='normal'
-                )
-
-        logger.info(f"Sent offline notifications to {offline_members.count()} users")
+                title=f'You have {member.unread_count} unread message(s)',
+                message=f'New messages in "{member.conversation.title}"',
+                data={
+                    'conversation_id': str(member.conversation_id),
+                    'unread_count': member.unread_count
+                },
+                action_url=f'/messages/{member.conversation_id}',
+                action_text='View Messages',
+                priority='normal',
+                created_at=now
+            )
+            for member in offline_members
+            if (member.user_id, str(member.conversation_id)) not in already_notified
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=1000)
+        push_created_notifications(notifications)
+
+        logger.info(f"Sent {len(notifications)} offline notifications ({len(offline_members)} offline members)")
 
     except Exception as e:
         logger.error(f"Error sending offline notifications: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+@shared_task(acks_late=True)
+def process_message_created(message_id, fan_out=True):
+    """Fan a newly committed message out to sockets, caches and offline notifications"""
+    message = Message.objects.select_related('conversation').filter(id=message_id).first()
+    if message is None:
+        logger.warning(f"Message {message_id} no longer exists, skipping fan-out")
+        return
+
+    try:
+        conversation = message.conversation
+        if fan_out:
+            message_data = {
+                'id': str(message.id),
+                'conversation_id': str(conversation.id),
+                'sender_id': message.sender_id,
+                'content': message.content,
+                'message_type': message.message_type,
+                'reply_to': str(message.reply_to_id) if message.reply_to_id else None,
+                'created_at': message.created_at.isoformat(),
+                'is_edited': message.is_edited,
+            }
+
+            # Every participant's messaging group, as the consumer routes its own messages;
+            # sockets are in that group whether or not they joined the conversation
+            async_to_sync(_fanout)([
+                f"messaging_{participant_id}" for participant_id in conversation.participants
+            ], {
+                'type': 'chat_message',
+                'message': message_data
+            })
+
+        # Invalidate conversation and participant caches
+        tags = [f"conversation:{conversation.id}"]
+        for participant_id in conversation.participants:
+            tags += [f"user:{participant_id}:conversations", f"user:{participant_id}:message_search"]
+        CacheManager.invalidate_tags(tags)
+
+        # Create notification for offline users
+        create_message_notification(message)
+
+        logger.info(f"Message {message.id} processed successfully")
+
+    except Exception as e:
+        logger.error(f"Error processing message {message.id}: {e}")
+
+
+def create_message_notification(message):
+    """Create notification for new message"""
+    try:
+        conversation = message.conversation
+        other_participants = [
+            p for p in conversation.participants
+            if str(p) != str(message.sender_id)
+        ]
+
+        # Cached by name and invalidated when the type is saved or deleted
+        notification_type = NotificationType.get_cached('new_message')
+
+        # Get sender info (cached in UserService)
+        sender_info = get_user_service().get_user_profile(message.sender_id)
+        sender_name = sender_info.get('username', 'Someone') if sender_info else 'Someone'
+
+        # One insert for every participant, then push them together
+        notifications = [
+            Notification(
+                recipient_id=str(participant_id),
+                notification_type=notification_type,
+                title='New Message',
+                message=f'{sender_name}: {message.content[:100]}{"..." if len(message.content) > 100 else ""}',
+                data={
+                    'conversation_id': str(conversation.id),
+                    'message_id': str(message.id),
+                    'sender_id': str(message.sender_id),
+                    'sender_name': sender_name,
+                    'conversation_title': conversation.title or 'Direct Message'
+                },
+                action_url=f'/messages/{conversation.id}',
+                action_text='View Message',
+                priority='normal'
+            )
+            for participant_id in other_participants
+        ]
+        Notification.objects.bulk_create(notifications)
+        push_created_notifications(notifications)
+
+    except Exception as e:
+        logger.error(f"Error creating message notification: {e}")
@@ -1,3 +1,152 @@
-from django.test import TestCase
+import tempfile
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .models import Conversation, ConversationMember, Message
+from .services import CacheManager
+from .tasks import enqueue, process_message_created, workers_share_state
+
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.gettempdir() + '/notifications-test-cache',
+    }
+}
+# Any layer other than the in-memory one counts as shared
+SHARED_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.BaseChannelLayer'}}
+
+
+class EnqueueTestCase(SimpleTestCase):
+    def test_per_process_backends_run_inline(self):
+        """With the default LocMemCache and in-memory layer the task runs in this process"""
+        task = Mock()
+        self.assertFalse(workers_share_state())
+        enqueue(task, 'abc')
+        task.assert_called_once_with('abc')
+        task.delay.assert_not_called()
+
+    @override_settings(CACHES=SHARED_CACHES, CHANNEL_LAYERS=SHARED_CHANNEL_LAYERS)
+    def test_shared_backends_queue_for_a_worker(self):
+        """With a shared cache and layer the task is queued instead"""
+        task = Mock()
+        self.assertTrue(workers_share_state())
+        enqueue(task, 'abc')
+        task.delay.assert_called_once_with('abc')
+        task.assert_not_called()
+
+    @override_settings(CACHES=SHARED_CACHES, CHANNEL_LAYERS=SHARED_CHANNEL_LAYERS)
+    def test_unreachable_broker_runs_inline(self):
+        """A broker error falls back to running the task here"""
+        task = Mock()
+        task.delay.side_effect = OSError('broker down')
+        enqueue(task, 'abc')
+        task.assert_called_once_with('abc')
+
+    def test_only_shared_cache_runs_inline(self):
+        """A shared cache alone is not enough while the channel layer is per-process"""
+        with override_settings(CACHES=SHARED_CACHES):
+            self.assertFalse(workers_share_state())
+
+
+class MessageCreatedSignalTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.conversation = Conversation.objects.create(participants=['1', '2'])
+        ConversationMember.objects.bulk_create([
+            ConversationMember(conversation=cls.conversation, user_id=user_id)
+            for user_id in ['1', '2']
+        ])
+
+    @patch("notifications.signals.enqueue")
+    def test_saving_message_queues_processing_once(self, mock_enqueue):
+        """Saving a Message updates the counters inline and queues process_message_created once"""
+        with self.captureOnCommitCallbacks(execute=True):
+            message = Message.objects.create(conversation=self.conversation, sender_id='1', content='hi')
+
+        mock_enqueue.assert_called_once_with(process_message_created, str(message.id), True)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_at, message.created_at)
+        unread = dict(ConversationMember.objects.filter(
+            conversation=self.conversation
+        ).values_list('user_id', 'unread_count'))
+        self.assertEqual(unread, {'1': 0, '2': 1})
+
+    @patch("notifications.signals.enqueue")
+    def test_consumer_delivered_message_skips_fan_out(self, mock_enqueue):
+        """Messages the socket consumer already delivered are queued without the socket fan-out"""
+        message = Message(conversation=self.conversation, sender_id='1', content='hi')
+        message.realtime_delivered = True
+        with self.captureOnCommitCallbacks(execute=True):
+            message.save(force_insert=True)
+
+        mock_enqueue.assert_called_once_with(process_message_created, str(message.id), False)
+
+
+class ProcessMessageCreatedTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.conversation = Conversation.objects.create(participants=['1', '2', '3'])
+        cls.message = Message.objects.create(conversation=cls.conversation, sender_id='1', content='hi')
+
+    @patch("notifications.tasks.create_message_notification")
+    def test_fans_out_to_every_participant(self, mock_notify):
+        """One gathered send reaches each participant's messaging group"""
+        layer = get_channel_layer()
+        for user_id in ['1', '2', '3']:
+            async_to_sync(layer.group_add)(f"messaging_{user_id}", f"test.{user_id}")
+
+        with patch("notifications.tasks.async_to_sync", wraps=async_to_sync) as mock_async_to_sync:
+            process_message_created(str(self.message.id))
+
+        mock_async_to_sync.assert_called_once()
+        for user_id in ['1', '2', '3']:
+            event = async_to_sync(layer.receive)(f"test.{user_id}")
+            self.assertEqual(event['type'], 'chat_message')
+            self.assertEqual(event['message']['id'], str(self.message.id))
+        mock_notify.assert_called_once()
+
+    @patch("notifications.tasks.create_message_notification")
+    def test_consumer_delivered_message_is_not_resent(self, mock_notify):
+        """fan_out=False still creates notifications but sends nothing to sockets"""
+        with patch("notifications.tasks._fanout") as mock_fanout:
+            process_message_created(str(self.message.id), False)
+
+        mock_fanout.assert_not_called()
+        mock_notify.assert_called_once()
+
+
+class ConversationCacheInvalidationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.conversation = Conversation.objects.create(participants=['1', '2'])
+
+    def setUp(self):
+        self.conversation_key = f"conversation_{self.conversation.id}_recent_messages"
+        self.user_key = "user_1_active_conversations"
+        CacheManager.cache_with_tags(self.conversation_key, ['cached'], [f"conversation:{self.conversation.id}"], 60)
+        CacheManager.cache_with_tags(self.user_key, ['cached'], ["user:1:conversations"], 60)
+
+    def assertInvalidated(self):
+        self.assertEqual(cache.get_many([self.conversation_key, self.user_key]), {})
+
+    def test_deactivating_conversation_invalidates_tags(self):
+        self.conversation.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conversation.save()
+        self.assertInvalidated()
+
+    def test_adding_member_invalidates_tags(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ConversationMember.objects.create(conversation=self.conversation, user_id='1')
+        self.assertInvalidated()
+
+    def test_removing_member_invalidates_tags(self):
+        member = ConversationMember.objects.create(conversation=self.conversation, user_id='1')
+        CacheManager.cache_with_tags(self.user_key, ['cached'], ["user:1:conversations"], 60)
+        with self.captureOnCommitCallbacks(execute=True):
+            member.delete()
+        self.assertEqual(cache.get(self.user_key), None)
@@ -17,7 +17,7 @@ from .views import (
 
     # Utility views
     HealthCheckView, AIChatView, AIConversationListView, AIConversationDetailView, AIConversationDeleteView,
-    AIConversationStatsView
+    AIConversationStatsView, AIConversationMessagesView
 )
 
 # Create router for ViewSets
@@ -65,6 +65,7 @@ urlpatterns = [
     path('ai/chat/', AIChatView.as_view(), name='ai_chat'),
     path('ai/conversations/', AIConversationListView.as_view(), name='ai_conversation_list'),
     path('ai/conversations/<uuid:pk>/', AIConversationDetailView.as_view(), name='ai_conversation_detail'),
+    path('ai/conversations/<uuid:conversation_id>/messages/', AIConversationMessagesView.as_view(), name='ai_conversation_messages'),
     path('ai/conversations/<uuid:conversation_id>/delete/', AIConversationDeleteView.as_view(), name='ai_conversation_delete'),
     path('ai/conversations/stats/', AIConversationStatsView.as_view(), name='ai_conversation_stats'),
 
@@ -1,11 +1,12 @@
 import logging
-from .services import MessagingService
+from .services import get_messaging_service
 from django.db import models
-from django.db.models import Q, F
+from django.db.models import Q, F, Prefetch, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
 from rest_framework import status, generics
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.views import APIView
 from django.db.models import Q
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
@@ -22,10 +23,54 @@ from .serializers import (
     MessageSerializer, ConversationCreateSerializer, MessageCreateSerializer
 )
 from .authentication import ServiceAuthentication, JWTAuthentication
-from .services import NotificationService, UserService
+from .services import get_user_service
+from .tasks import enqueue, send_notification_task
 
 logger = logging.getLogger(__name__)
 
+# Keys NotificationSerializer renders; the joined type only contributes its name
+NOTIFICATION_LIST_FIELDS = (
+    'id', 'recipient_id', 'notification_type_name', 'title', 'message', 'data',
+    'priority', 'status', 'action_url', 'action_text',
+    'created_at', 'sent_at', 'delivered_at', 'read_at', 'expires_at',
+)
+
+
+def read_statuses_prefetch():
+    """Prefetch read statuses with only the columns MessageSerializer.get_read_by renders"""
+    return Prefetch(
+        'read_statuses',
+        queryset=MessageReadStatus.objects.only('id', 'message_id', 'user_id', 'read_at')
+    )
+
+
+def last_message_prefetch():
+    """Prefetch each conversation's newest visible message in one windowed query"""
+    return Prefetch(
+        'messages',
+        queryset=Message.objects.filter(is_deleted=False).annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('conversation_id'),
+                order_by=F('created_at').desc()
+            )
+        ).filter(row_number=1).only(
+            'id', 'conversation_id', 'content', 'sender_id', 'created_at', 'message_type'
+        ),
+        to_attr='latest_messages'
+    )
+
+
+def user_member_prefetch(user_id):
+    """Prefetch only the requesting user's membership row, for unread counts"""
+    return Prefetch(
+        'members',
+        queryset=ConversationMember.objects.filter(user_id=user_id).only(
+            'id', 'conversation_id', 'unread_count'
+        ),
+        to_attr='user_members'
+    )
+
 
 class StandardPagination(PageNumberPagination):
     page_size = 20
@@ -94,10 +139,11 @@ class ConversationParticipantsView(APIView):
             ).first()
             if not conversation:
                 raise Conversation.DoesNotExist()
-            user_service = UserService()
+            # One cache get_many plus at most one batch request for the whole list
+            profiles = get_user_service().get_multiple_user_profiles(conversation.participants)
             participants_data = []
             for participant_id in conversation.participants:
-                user_data = user_service.get_user_profile(participant_id)
+                user_data = profiles.get(participant_id)
                 if user_data:
                     participants_data.append({
                         'id': participant_id,
@@ -152,8 +198,7 @@ class EditMessageView(APIView):
             message.is_edited = True
             message.save(update_fields=['content', 'is_edited', 'updated_at'])
 
-            messaging_service = MessagingService()
-            messaging_service.send_message_update(message, 'edited')
+            get_messaging_service().send_message_update(message, 'edited')
 
             serializer = MessageSerializer(message)
             return Response(serializer.data)
@@ -175,8 +220,7 @@ class DeleteMessageView(APIView):
             message.is_deleted = True
             message.save(update_fields=['is_deleted', 'updated_at'])
 
-            messaging_service = MessagingService()
-            messaging_service.send_message_update(message, 'deleted')
+            get_messaging_service().send_message_update(message, 'deleted')
 
             return Response({'message': 'Message deleted successfully'})
         except Message.DoesNotExist:
@@ -204,7 +248,9 @@ class SearchMessagesView(APIView):
         if conversation_id:
             search_filter &= Q(conversation_id=conversation_id)
 
-        messages = Message.objects.filter(search_filter).order_by('-created_at')[:50]
+        messages = Message.objects.filter(search_filter).select_related('reply_to').prefetch_related(
+            read_statuses_prefetch()
+        ).order_by('-created_at')[:50]
         serializer = MessageSerializer(messages, many=True)
         return Response({
             'query': query,
@@ -222,8 +268,8 @@ class CreateNotificationView(APIView):
         serializer = NotificationCreateSerializer(data=request.data)
         if serializer.is_valid():
             try:
-                notification_type = NotificationType.objects.get(
-                    name=serializer.validated_data['notification_type']
+                notification_type = NotificationType.get_cached(
+                    serializer.validated_data['notification_type']
                 )
                 notification = Notification.objects.create(
                     recipient_id=serializer.validated_data['recipient_id'],
@@ -236,8 +282,9 @@ class CreateNotificationView(APIView):
                     action_text=serializer.validated_data.get('action_text'),
                     expires_at=serializer.validated_data.get('expires_at')
                 )
-                notification_service = NotificationService()
-                notification_service.send_notification(notification)
+                # Channel fan-out (email rendering, users service lookups) happens in the worker
+                # when one shares the cache and channel layer, otherwise here
+                enqueue(send_notification_task, str(notification.id))
                 return Response({'id': str(notification.id), 'message': 'Notification created successfully'}, status=status.HTTP_201_CREATED)
             except NotificationType.DoesNotExist:
                 return Response({'error': f'Notification type "{serializer.validated_data["notification_type"]}" not found'}, status=status.HTTP_400_BAD_REQUEST)
@@ -270,7 +317,10 @@ class UserNotificationsView(generics.ListAPIView):
 
     def get_queryset(self):
         user_id = self.request.user.user_id
-        queryset = Notification.objects.filter(recipient_id=user_id)
+        # Plain dicts straight from the cursor, shaped like NotificationSerializer output
+        queryset = Notification.objects.filter(recipient_id=user_id).annotate(
+            notification_type_name=F('notification_type__name')
+        ).values(*NOTIFICATION_LIST_FIELDS)
 
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -289,6 +339,14 @@ class UserNotificationsView(generics.ListAPIView):
 
         return queryset.order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        # The rows are read-only and already serializable, so skip building a serializer per row
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
+
 
 class MarkNotificationReadView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -315,7 +373,7 @@ class MarkAllNotificationsReadView(APIView):
         Notification.objects.filter(
             recipient_id=user_id,
             status__in=['pending', 'sent', 'delivered']
-        ).update(status='read', read_at=timezone.now())
+        ).mark_read()
         return Response({'message': 'All notifications marked as read'})
 
 
@@ -346,11 +404,14 @@ class ConversationListView(generics.ListAPIView):
     def get_queryset(self):
         user_id = str(self.request.user.user_id)
 
-        # Get conversations where user is a member (SQLite compatible)
+        # Get conversations where user is a member; (conversation, user_id) is unique,
+        # so the join yields each conversation once and needs no DISTINCT
         queryset = Conversation.objects.filter(
             members__user_id=user_id,
             is_active=True
-        ).distinct().order_by('-last_message_at')
+        ).prefetch_related(
+            last_message_prefetch(), user_member_prefetch(user_id)
+        ).order_by('-last_message_at')
 
         # Filter by type
         conversation_type = self.request.query_params.get('type')
@@ -418,18 +479,14 @@ class ConversationMessagesView(generics.ListAPIView):
         conversation_id = self.kwargs['conversation_id']
         user_id = str(self.request.user.user_id)
 
-        # Verify user has access to conversation using ConversationMember
-        conversation = Conversation.objects.filter(
-            id=conversation_id,
-            members__user_id=user_id
-        ).first()
-        if not conversation:
+        # Verify user has access to conversation using the cached member ids
+        if not ConversationMember.is_member(conversation_id, user_id):
             return Message.objects.none()
 
         return Message.objects.filter(
-            conversation=conversation,
+            conversation_id=conversation_id,
             is_deleted=False
-        ).order_by('-created_at')
+        ).select_related('reply_to').prefetch_related(read_statuses_prefetch()).order_by('-created_at')
 
 
 class SendMessageView(generics.CreateAPIView):
@@ -451,24 +508,13 @@ class SendMessageView(generics.CreateAPIView):
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("Access denied to conversation")
 
-        message = serializer.save(
+        # signals.message_created updates last_message_at and unread counts in this
+        # transaction, then fans the message out once it commits
+        return serializer.save(
             conversation=conversation,
             sender_id=user_id
         )
 
-        # Update conversation timestamp
-        conversation.last_message_at = message.created_at
-        conversation.save(update_fields=['last_message_at'])
-
-        # Update unread counts for other participants
-        ConversationMember.objects.filter(
-            conversation=conversation
-        ).exclude(user_id=user_id).update(
-            unread_count=F('unread_count') + 1
-        )
-
-        return message
-
 
 class ConversationStatsView(APIView):
     """Get conversation statistics for user"""
@@ -478,27 +524,20 @@ class ConversationStatsView(APIView):
     def get(self, request):
         user_id = str(request.user.user_id)
 
-        # Use ConversationMember for counting (SQLite compatible)
-        total_conversations = Conversation.objects.filter(
-            members__user_id=user_id,
-            is_active=True
-        ).count()
-
-        unread_conversations = ConversationMember.objects.filter(
-            user_id=user_id,
-            unread_count__gt=0,
-            conversation__is_active=True
-        ).count()
-
-        total_unread_messages = ConversationMember.objects.filter(
+        # One pass over the user's membership rows (SQLite compatible)
+        stats = ConversationMember.objects.filter(
             user_id=user_id,
             conversation__is_active=True
-        ).aggregate(total=models.Sum('unread_count'))['total'] or 0
+        ).aggregate(
+            total_conversations=models.Count('id'),
+            unread_conversations=models.Count('id', filter=Q(unread_count__gt=0)),
+            total_unread_messages=models.Sum('unread_count')
+        )
 
         return Response({
-            'total_conversations': total_conversations,
-            'unread_conversations': unread_conversations,
-            'total_unread_messages': total_unread_messages
+            'total_conversations': stats['total_conversations'],
+            'unread_conversations': stats['unread_conversations'],
+            'total_unread_messages': stats['total_unread_messages'] or 0
         })
 
 
@@ -531,15 +570,11 @@ class MarkConversationReadView(APIView):
                     user_id=user_id
                 )
 
-            member = ConversationMember.objects.filter(
+            # Single UPDATE, so a message arriving concurrently can't be lost to a stale save()
+            ConversationMember.objects.filter(
                 conversation=conversation,
                 user_id=user_id
-            ).first()
-
-            if member:
-                member.unread_count = 0
-                member.last_seen_at = timezone.now()
-                member.save(update_fields=['unread_count', 'last_seen_at'])
+            ).update(unread_count=0, last_seen_at=timezone.now())
 
             return Response({'message': 'Conversation marked as read'})
 
@@ -569,10 +604,10 @@ class HealthCheckView(APIView):
 
 from .models import AIConversation, AIMessage
 from .serializers import (
-    AIConversationSerializer, AIMessageSerializer,
+    AIConversationSerializer, AIConversationListSerializer, AIMessageSerializer,
     AIChatRequestSerializer, AIConversationCreateSerializer
 )
-from .services import AIChatService
+from .services import get_ai_chat_service
 
 
 # ============= AI CHAT VIEWS =============
@@ -589,7 +624,7 @@ class AIChatView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            ai_service = AIChatService()
+            ai_service = get_ai_chat_service()
             result = ai_service.generate_response(
                 user_message=serializer.validated_data['message'],
                 user_id=str(request.user.user_id),
@@ -609,7 +644,7 @@ class AIChatView(APIView):
 
 class AIConversationListView(generics.ListAPIView):
     """List user's AI conversations"""
-    serializer_class = AIConversationSerializer
+    serializer_class = AIConversationListSerializer
     pagination_class = StandardPagination
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -634,6 +669,29 @@ class AIConversationDetailView(generics.RetrieveAPIView):
         )
 
 
+class AIMessageCursorPagination(CursorPagination):
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    ordering = 'created_at'
+
+
+class AIConversationMessagesView(generics.ListAPIView):
+    """Page through an AI conversation's history without loading all of it"""
+    serializer_class = AIMessageSerializer
+    pagination_class = AIMessageCursorPagination
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        # Ownership is checked in the same query through the conversation join
+        return AIMessage.objects.filter(
+            conversation_id=self.kwargs['conversation_id'],
+            conversation__user_id=str(self.request.user.user_id),
+            conversation__is_active=True
+        )
+
+
 class AIConversationDeleteView(APIView):
     """Delete an AI conversation"""
     authentication_classes = [JWTAuthentication]
@@ -641,7 +699,7 @@ class AIConversationDeleteView(APIView):
 
     def delete(self, request, conversation_id):
         try:
-            ai_service = AIChatService()
+            ai_service = get_ai_chat_service()
             success = ai_service.delete_conversation(
                 conversation_id=conversation_id,
                 user_id=str(request.user.user_id)